@@ -0,0 +1 @@
+# Scraping pipeline for the Fight Facts databases (ufcstats.com + ESPN)
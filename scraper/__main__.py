@@ -0,0 +1,107 @@
+# One entry point for the scraping jobs:
+#
+#   python -m scraper incremental   new events plus a recheck of recent/flagged ones
+#   python -m scraper backfill      every event not yet committed (--engine espn for ESPN)
+#   python -m scraper reparse       re-run the parsers over the page cache, no network
+#   python -m scraper ingest        upsert ufc.csv / fighters.csv into the SQLite DBs
+#   python -m scraper migrate       one-off DB migration for --ingest (dry run unless --apply)
+#   python -m scraper release       build shared/fightfacts.db
+#
+# Each subcommand imports its engine only when it runs, so the jobs that don't need a
+# browser never import Selenium, and nothing launches Chrome until a page is loaded.
+import argparse
+
+def scrape_options(parser: argparse.ArgumentParser):
+    parser.add_argument("--workers", type=int, default=8, help="requests in flight (browsers for --engine espn)")
+    parser.add_argument("--profiles-db", default="profiles.db",
+                        help="fighter profile store; pass '' to skip fighter bios")
+    parser.add_argument("--ingest", action="store_true",
+                        help="also upsert each event into shared/ufcSQL.db and shared/fighters.db")
+    parser.add_argument("--parquet", metavar="DIR",
+                        help="also write each event to a Parquet dataset partitioned by year")
+    parser.add_argument("--cache-dir", default=".page_cache")
+    parser.add_argument("--retry-log", default="retries.jsonl")
+    parser.add_argument("--metrics", default="metrics",
+                        help="write run metrics to METRICS.json and METRICS.prom; pass '' to skip")
+
+def incremental(args):
+    from scraper import ufcstats
+    ufcstats.main(args.workers, args.cache_dir, False, args.profiles_db, args.ingest, args.parquet,
+                  args.digests_db, args.recheck, args.retry_log, metrics_path=args.metrics)
+
+def backfill(args):
+    if args.engine == "espn":
+        from scraper import espn
+        espn.main(args.workers, args.profiles_db, args.ingest, args.parquet, args.retry_log, args.metrics,
+                  args.trace)
+    else:
+        from scraper import ufcstats
+        ufcstats.main(args.workers, args.cache_dir, False, args.profiles_db, args.ingest, args.parquet,
+                      args.digests_db, 0, args.retry_log, backfill=True, metrics_path=args.metrics)
+
+def reparse(args):
+    from scraper import ufcstats
+    ufcstats.main(args.workers, args.cache_dir, True, args.profiles_db, args.ingest, args.parquet,
+                  retry_log=args.retry_log, metrics_path=args.metrics)
+
+def ingest(args):
+    from scraper import ingest
+    ingest.main(args.fights_csv, args.fighters_csv, args.ufc_db, args.fighters_db)
+
+def migrate(args):
+    from scraper import ingest
+    ingest.migrate(args.ufc_db, args.fighters_db, args.apply)
+
+def release(args):
+    from scraper.release import build_release
+    counts = build_release(args.ufc_db, args.fighters_db, args.out)
+    print(", ".join(f"{count} {table}" for table, count in counts.items()))
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(prog="python -m scraper", description="Fight Facts scraping jobs")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    command = subcommands.add_parser("incremental", help="scrape new events and recheck recent ones")
+    scrape_options(command)
+    command.add_argument("--digests-db", default="page_digests.db")
+    command.add_argument("--recheck", type=int, default=5,
+                         help="revalidate this many of the newest events already scraped")
+    command.set_defaults(run=incremental)
+
+    command = subcommands.add_parser("backfill", help="scrape every event not yet committed")
+    scrape_options(command)
+    command.add_argument("--engine", choices=["ufcstats", "espn"], default="ufcstats")
+    command.add_argument("--trace", metavar="PATH",
+                         help="(espn) record every WebDriver command; writes PATH.txt and PATH.folded")
+    command.add_argument("--digests-db", default="page_digests.db")
+    command.set_defaults(run=backfill)
+
+    command = subcommands.add_parser("reparse", help="re-run the parsers over cached pages, offline")
+    scrape_options(command)
+    command.set_defaults(run=reparse)
+
+    # Same defaults as scraper.ingest / scraper.release, spelled out so --help stays import-free
+    command = subcommands.add_parser("ingest", help="upsert scraped CSVs into the SQLite databases")
+    command.add_argument("fights_csv", nargs="?", default="ufc.csv")
+    command.add_argument("--fighters-csv")
+    command.add_argument("--ufc-db", default="shared/ufcSQL.db")
+    command.add_argument("--fighters-db", default="shared/fighters.db")
+    command.set_defaults(run=ingest)
+
+    command = subcommands.add_parser("migrate", help="report (or --apply) the one-off migration ingest needs")
+    command.add_argument("--ufc-db", default="shared/ufcSQL.db")
+    command.add_argument("--fighters-db", default="shared/fighters.db")
+    command.add_argument("--apply", action="store_true", help="make the changes instead of listing them")
+    command.set_defaults(run=migrate)
+
+    command = subcommands.add_parser("release", help="build the read-only release database")
+    command.add_argument("--ufc-db", default="shared/ufcSQL.db")
+    command.add_argument("--fighters-db", default="shared/fighters.db")
+    command.add_argument("--out", default="shared/fightfacts.db")
+    command.set_defaults(run=release)
+
+    args = parser.parse_args(argv)
+    args.run(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+# Offline benchmark: the draft pipelines against the local fixture site
+# (scraper.fixture_site), with configurable latency and failure injection.
+#
+#   draft_1   ufcstats events list -> event pages -> fight pages
+#   draft_0   the same plus fighter bios (Bing -> ESPN profile -> bio tab)
+#   draft_2   ESPN schedules -> fight cards -> fighter profiles and bios
+#
+# These are the scraper/ engines that replaced the drafts, over HTTP with the real
+# Fetcher, parsers, retries and CSV sink; draft_2 runs the espn engine's parsers on
+# fetched pages, since a browser needs chromedriver (and a network to install it).
+# Rate limits are off, so the numbers measure the scraper rather than its politeness.
+#
+# Each pipeline runs in a fresh process so its peak RSS is its own. Results are
+# appended to bench_results.jsonl and compared with the last run of the same config.
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from urllib.parse import parse_qs, urlsplit
+
+from scraper import ufcstats
+from scraper.fetch import Fetcher
+from scraper.fixture_site import Faults, FixtureServer, FixtureSite, local_session
+from scraper.metrics import Metrics
+from scraper.parsers import bing, espn, ufcstats as ufcstats_parsers
+from scraper.profiles import FighterRegistry
+from scraper.ratelimit import HostRateLimiter
+from scraper.resilience import Resilience
+from scraper.sink import CsvSink
+
+RESULTS = "bench_results.jsonl"
+
+ESPN_SCHEDULE = "https://www.espn.com/mma/schedule/_/year/{year}/league/ufc"
+
+def ufcstats_pipeline(fetcher: Fetcher, bios: bool):
+    registry = FighterRegistry() if bios else None
+    for event_url, fights in ufcstats.scrape_events(fetcher, ufcstats.get_event_links(fetcher), registry):
+        yield event_url, fights, registry.drain() if registry else []
+
+def espn_fighter(fetcher: Fetcher, link: str, gender: str) -> tuple[dict, str]:
+    bio_link = espn.parse_profile(fetcher.get(link), link)
+    return espn.parse_fighter(fetcher.get(bio_link), bio_link).as_row(gender), link
+
+def espn_pipeline(fetcher: Fetcher):
+    from scraper.espn import fight_record, main_url  # imports Selenium, so only when it runs
+    registry = FighterRegistry()
+    years = espn.parse_years(fetcher.get(main_url), main_url)
+    schedules = [ESPN_SCHEDULE.format(year=year) for year in years]
+    event_links = []
+    for year, url, page in zip(years, schedules, fetcher.map(schedules)):
+        event_links += espn.parse_schedule(page, url, past_only=year == str(datetime.now().year))
+
+    for event_url, page in zip(event_links, fetcher.map(event_links, window=2)):
+        with fetcher.metrics.stage("parse"):
+            header = espn.parse_event(page, event_url)
+            bouts = [espn.parse_bout(page, i, event_url) for i in range(espn.count_bouts(page))]
+        jobs = [(link, bout.gender) for bout in bouts for link in bout.fighter_links]
+        fighters = iter(fetcher.executor.map(
+            lambda job: registry.get_or_scrape(job[0], lambda: espn_fighter(fetcher, *job)), jobs))
+        fights = [fight_record(bout, [next(fighters) for _ in bout.fighter_links], header.name, header.date,
+                               header.location)
+                  for bout in bouts]
+        yield event_url, fights, registry.drain()
+
+PIPELINES = {
+    "draft_0": lambda fetcher: ufcstats_pipeline(fetcher, bios=True),
+    "draft_1": lambda fetcher: ufcstats_pipeline(fetcher, bios=False),
+    "draft_2": espn_pipeline,
+}
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+# Runs in its own process; returns the pipeline's numbers
+def run_pipeline(name: str, base_url: str, workers: int) -> dict:
+    metrics = Metrics()
+    with tempfile.TemporaryDirectory() as out:
+        fetcher = Fetcher(session=local_session(base_url, workers), max_in_flight=workers,
+                          limiter=HostRateLimiter({}), resilience=Resilience(metrics=metrics), metrics=metrics)
+        sink = CsvSink(os.path.join(out, "ufc.csv"), os.path.join(out, "fighters.csv"),
+                       os.path.join(out, "scrape_checkpoint.jsonl"))
+        started = time.perf_counter()
+        error = None
+        with fetcher, sink:
+            try:
+                for event_url, fights, fighters in PIPELINES[name](fetcher):
+                    with metrics.stage("write"):
+                        sink.write_event(event_url, fights, fighters)
+                    metrics.inc("records", len(fights), kind="fights")
+                    metrics.inc("records", len(fighters), kind="fighters")
+            except Exception as e:
+                # e.g. a host's retry budget running out under heavy failure injection
+                error = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - started
+
+    pages = metrics.total("pages")
+    records = metrics.total("records")
+    stages = metrics.to_json()["stages"]
+    parse = stages.get("parse", {"seconds": 0.0})["seconds"]
+    return {
+        "pipeline": name,
+        "seconds": round(elapsed, 3),
+        "pages": int(pages),
+        "records": int(records),
+        "pages_per_s": round(pages / elapsed, 2),
+        "records_per_s": round(records / elapsed, 2),
+        "retries": int(metrics.total("retries")),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "parse_ms_per_page": round(1000 * parse / pages, 3) if pages else None,
+        "stages": {stage: values["seconds"] for stage, values in stages.items()},
+        "error": error,
+    }
+
+# Parser time per page type on one representative page each, no I/O. Best of
+# `repeat`, which is steadier than the median on a shared box.
+def parse_times(site: FixtureSite, repeat: int = 50) -> dict:
+    event, fight = site.events[0], site.events[0]["fights"][0]
+    fighter = site.fighters[fight["fighters"][0]]
+    schedule = ESPN_SCHEDULE.format(year=event["date"].year)
+    card = f"https://www.espn.com/mma/fightcenter/_/id/{event['espn_id']}/league/ufc"
+    profile = f"https://www.espn.com/mma/fighter/_/id/{fighter['espn_id']}/{fighter['slug']}"
+    bio = f"https://www.espn.com/mma/fighter/bio/_/id/{fighter['espn_id']}/{fighter['slug']}"
+    search = f"https://www.bing.com/search?q=%2Bsite%3Aespn.com+{fighter['first_name']}+{fighter['last_name']}"
+
+    def page(url: str) -> str:
+        parts = urlsplit(url)
+        return site.page(f"/{parts.netloc}{parts.path}", parse_qs(parts.query))[1]
+
+    def espn_card(page: str, url: str):
+        return [espn.parse_bout(page, i, url) for i in range(espn.count_bouts(page))]
+
+    cases = {
+        "ufcstats.events": (ufcstats_parsers.parse_event_links, "http://ufcstats.com/statistics/events/completed"),
+        "ufcstats.event": (ufcstats_parsers.parse_event, f"http://ufcstats.com/event-details/{event['ufc_id']}"),
+        "ufcstats.fight": (ufcstats_parsers.parse_fight, f"http://ufcstats.com/fight-details/{fight['ufc_id']}"),
+        "bing.search": (bing.parse_first_result, search),
+        "espn.schedule": (espn.parse_schedule, schedule),
+        "espn.event": (espn_card, card),
+        "espn.fighter": (espn.parse_profile, profile),
+        "espn.bio": (espn.parse_fighter, bio),
+    }
+    times = {}
+    for page_type, (parser, url) in cases.items():
+        body = page(url)
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            parser(body, url)
+            samples.append(time.perf_counter() - started)
+        times[page_type] = round(1000 * min(samples), 3)
+    return times
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def previous_results(path: str, config: dict) -> dict:
+    previous = {}
+    if os.path.isfile(path):
+        with open(path, "r") as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry["config"] == config:
+                    previous[entry["pipeline"]] = entry
+    return previous
+
+def change(now: float, before: float) -> str:
+    if not before or now is None:
+        return ""
+    return f" ({(now - before) / before:+.1%})"
+
+def main(pipelines: list[str], config: dict, workers: int = 8, repeat: int = 50, results: str = RESULTS):
+    site = FixtureSite(config["events"], config["fights"], seed=config["seed"])
+    faults = Faults(config["latency"], config["jitter"], config["fail_rate"], 503, config["drop_rate"],
+                    config["seed"])
+    entries = []
+    with FixtureServer(site, faults) as server:
+        for name in pipelines:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                entries.append(executor.submit(run_pipeline, name, server.url, workers).result())
+        served = dict(server.counts)
+    entries.append({"pipeline": "parsers", "parse_ms": parse_times(site, repeat)})
+
+    run = {"at": time.time(), "commit": git_commit(), "host": platform.node(),
+           "python": platform.python_version(), "config": {**config, "workers": workers}}
+    previous = previous_results(results, run["config"])
+    for entry in entries:
+        before = previous.get(entry["pipeline"], {})
+        if entry["pipeline"] == "parsers":
+            print(f"Parse time per page (best of {repeat}):")
+            for page_type, ms in entry["parse_ms"].items():
+                print(f"  {page_type:18} {ms:8.3f} ms{change(ms, before.get('parse_ms', {}).get(page_type))}")
+            continue
+        print(f"{entry['pipeline']}: {entry['pages']} pages, {entry['records']} records in {entry['seconds']:.2f} s")
+        print(f"  {entry['pages_per_s']:.1f} pages/s{change(entry['pages_per_s'], before.get('pages_per_s'))}, "
+              f"{entry['records_per_s']:.1f} records/s{change(entry['records_per_s'], before.get('records_per_s'))}, "
+              f"peak RSS {entry['peak_rss_mb']:.0f} MB{change(entry['peak_rss_mb'], before.get('peak_rss_mb'))}, "
+              f"parse {entry['parse_ms_per_page']} ms/page, {entry['retries']} retries")
+        if entry["error"]:
+            print(f"  stopped early: {entry['error']}")
+    if before := next(iter(previous.values()), None):
+        print(f"(compared with {before['commit'] or 'an earlier run'} "
+              f"at {datetime.fromtimestamp(before['at']):%Y-%m-%d %H:%M})")
+    print(f"Server: {served['ok']} ok, {served['fail']} failed, {served['drop']} dropped")
+
+    with open(results, "a") as f:
+        for entry in entries:
+            f.write(json.dumps({**run, **entry}) + "\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against a local fixture site")
+    parser.add_argument("pipelines", nargs="*", help=f"any of {', '.join(PIPELINES)} (default: all)")
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--fights", type=int, default=12, help="fights per event")
+    parser.add_argument("--workers", type=int, default=8, help="requests in flight")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many more seconds, at random")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with a 503")
+    parser.add_argument("--drop-rate", type=float, default=0.0,
+                        help="fraction of connections closed without a response")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=50, help="parser timing samples per page type")
+    parser.add_argument("--results", default=RESULTS)
+    args = parser.parse_args()
+    unknown = set(args.pipelines) - set(PIPELINES)
+    if unknown:
+        parser.error(f"unknown pipelines: {', '.join(sorted(unknown))}")
+    main(args.pipelines or list(PIPELINES), {"events": args.events, "fights": args.fights, "latency": args.latency,
+                          "jitter": args.jitter, "fail_rate": args.fail_rate, "drop_rate": args.drop_rate,
+                          "seed": args.seed},
+         args.workers, args.repeat, args.results)
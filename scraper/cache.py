@@ -0,0 +1,87 @@
+# On-disk page cache. Each page is stored gzip-compressed under the sha256 of its
+# URL, next to a small JSON file with the fetch time and validators.
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+DAY = 24 * 60 * 60
+
+# Pages that can still change get a TTL (seconds); None means the page never expires.
+# Completed event and fight pages are history, so they are cached for good. The
+# events index is where new events show up, so it is always revalidated (TTL 0).
+def ttl_for(url: str) -> float | None:
+    if re.search(r"ufcstats\.com/(event|fight)-details/", url):
+        return None
+    if "ufcstats.com/statistics/events" in url:
+        return 0
+    if "espn.com/mma/schedule" in url:
+        year = re.search(r"/year/(\d{4})", url)
+        if year and int(year.group(1)) < datetime.now().year:
+            return None
+        return DAY
+    if "espn.com/mma/fighter" in url:
+        return 7 * DAY
+    if "bing.com" in url:
+        return 30 * DAY
+    return DAY
+
+@dataclass
+class CachedPage:
+    url: str
+    body: str
+    fetched_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def is_fresh(self, now: float = None) -> bool:
+        ttl = ttl_for(self.url)
+        return ttl is None or (now or time.time()) - self.fetched_at < ttl
+
+class CacheMiss(KeyError):
+    pass
+
+class PageCache:
+    def __init__(self, root: str = ".page_cache"):
+        self.root = root
+
+    def key(self, url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def path(self, url: str) -> str:
+        key = self.key(url)
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, url: str) -> CachedPage | None:
+        path = self.path(url)
+        try:
+            with open(path + ".json", "r") as f:
+                meta = json.load(f)
+            with gzip.open(path + ".gz", "rt", encoding="utf-8") as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        return CachedPage(url, body, meta["fetched_at"], meta.get("etag"), meta.get("last_modified"))
+
+    def put(self, url: str, body: str, etag: str = None, last_modified: str = None) -> CachedPage:
+        page = CachedPage(url, body, time.time(), etag, last_modified)
+        path = self.path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to temp files and rename, so a crash never leaves a torn entry
+        with gzip.open(path + ".gz.tmp", "wt", encoding="utf-8") as f:
+            f.write(body)
+        with open(path + ".json.tmp", "w") as f:
+            json.dump({"url": url, "fetched_at": page.fetched_at, "etag": etag,
+                       "last_modified": last_modified}, f)
+        os.replace(path + ".gz.tmp", path + ".gz")
+        os.replace(path + ".json.tmp", path + ".json")
+        return page
+
+    # Server said 304 Not Modified: keep the body, restart the TTL
+    def touch(self, page: CachedPage) -> CachedPage:
+        return self.put(page.url, page.body, page.etag, page.last_modified)
@@ -0,0 +1,104 @@
+# Change detection for ufcstats event and fight pages. Each page's digest (sha1 of
+# its HTML with whitespace collapsed) is kept in SQLite. Incremental runs revalidate
+# the newest few events plus any flagged ones and only re-process events whose pages
+# changed, which catches amended cards and late overturns that a single
+# last_scraped_event.txt URL never sees.
+#
+# Digests are staged while an event is processed and committed only after its rows
+# are written, so a crash in between means the change is seen again next run.
+import argparse
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    checked_at REAL NOT NULL,
+    changed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS flagged (
+    url TEXT PRIMARY KEY,
+    reason TEXT,
+    flagged_at REAL NOT NULL
+);
+"""
+
+def page_digest(page: str) -> str:
+    return hashlib.sha1(re.sub(r"\s+", " ", page).strip().encode("utf-8")).hexdigest()
+
+class ChangeTracker:
+    def __init__(self, path: str = "page_digests.db"):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.staged = {}
+
+    def known(self, url: str) -> bool:
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM pages WHERE url = ?", (url,)).fetchone() is not None
+
+    # True if the page is new or differs from the committed digest
+    def changed(self, url: str, page: str) -> bool:
+        digest = page_digest(page)
+        with self.lock:
+            row = self.conn.execute("SELECT digest FROM pages WHERE url = ?", (url,)).fetchone()
+            self.staged[url] = digest
+        return row is None or row[0] != digest
+
+    # Drops staged digests (of an event that failed part-way), so the committed ones
+    # stay the baseline and the change is seen again
+    def discard(self, urls: list[str]):
+        with self.lock:
+            for url in urls:
+                self.staged.pop(url, None)
+
+    def commit(self):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                """INSERT INTO pages (url, digest, checked_at, changed_at) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(url) DO UPDATE SET
+                     checked_at = excluded.checked_at,
+                     changed_at = CASE WHEN digest = excluded.digest THEN changed_at
+                                       ELSE excluded.changed_at END,
+                     digest = excluded.digest""",
+                [(url, digest, now, now) for url, digest in self.staged.items()])
+            self.staged = {}
+
+    def flag(self, url: str, reason: str = None):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO flagged (url, reason, flagged_at) VALUES (?, ?, ?)",
+                              (url, reason, time.time()))
+
+    def unflag(self, url: str):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM flagged WHERE url = ?", (url,))
+
+    def flagged(self) -> list[str]:
+        with self.lock:
+            return [url for url, in self.conn.execute("SELECT url FROM flagged ORDER BY flagged_at")]
+
+    def close(self):
+        self.conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Flag ufcstats events for a full recheck on the next run")
+    parser.add_argument("--db", default="page_digests.db")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    flag = subcommands.add_parser("flag", help="recheck these event URLs next run")
+    flag.add_argument("urls", nargs="+")
+    flag.add_argument("--reason")
+    subcommands.add_parser("list", help="show flagged events")
+    args = parser.parse_args()
+
+    tracker = ChangeTracker(args.db)
+    if args.command == "flag":
+        for url in args.urls:
+            tracker.flag(url, args.reason)
+    for url in tracker.flagged():
+        print(url)
+    tracker.close()
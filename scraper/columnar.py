@@ -0,0 +1,215 @@
+# Parquet output next to the CSVs: typed, hive-partitioned by event year, so a load
+# reads only the columns and years it needs instead of parsing all of ufc.csv.
+#
+#   <root>/fights/year=2025/<event>.parquet      FIGHT_SCHEMA
+#   <root>/fighters/year=2025/<event>.parquet    FIGHTER_SCHEMA (the year they were met)
+#
+# Values go through scraper.normalize first, so heights are inches, dates are dates
+# and methods are the fixed enum. Each event is one file named after its URL, so
+# rewriting an event (a resumed or offline run) replaces its file instead of adding
+# rows; compact() folds a year's event files into one file, part-0, deduplicated by
+# key. Rewriting an event that is already folded into part-0 also drops its rows
+# (same event or key) from part-0, so they aren't read twice.
+import argparse
+import glob
+import hashlib
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from scraper.merge import fight_keys, fighter_keys
+from scraper.normalize import normalize_fighters, normalize_fights
+
+PARQUET_DIR = "dataset"
+
+FIGHT_SCHEMA = pa.schema([
+    ("fight_key", pa.string()),
+    ("event", pa.string()),
+    ("date", pa.date32()),
+    ("location", pa.string()),
+    ("fighter_0_first_name", pa.string()),
+    ("fighter_0_last_name", pa.string()),
+    ("fighter_1_first_name", pa.string()),
+    ("fighter_1_last_name", pa.string()),
+    ("winner", pa.string()),
+    ("wasDraw", pa.bool_()),
+    ("title", pa.bool_()),
+    ("gender", pa.string()),
+    ("weight", pa.string()),
+    ("method", pa.dictionary(pa.int8(), pa.string())),
+    ("rounds", pa.int8()),
+    ("fight_time_s", pa.int16()),
+    ("parse_errors", pa.string()),
+])
+
+FIGHTER_SCHEMA = pa.schema([
+    ("fighter_key", pa.string()),
+    ("first_name", pa.string()),
+    ("last_name", pa.string()),
+    ("nickname", pa.string()),
+    ("gender", pa.string()),
+    ("wins", pa.int16()),
+    ("losses", pa.int16()),
+    ("draws", pa.int16()),
+    ("image", pa.string()),
+    ("height_in", pa.int16()),
+    ("weight_lbs", pa.int16()),
+    ("reach_in", pa.int16()),
+    ("stance", pa.string()),
+    ("weightclass", pa.string()),
+    ("birth_date", pa.date32()),
+    ("parse_errors", pa.string()),
+])
+
+PARTITIONING = ds.partitioning(pa.schema([("year", pa.int16())]), flavor="hive")
+
+def fights_table(rows: list[dict]) -> pd.DataFrame:
+    frame = normalize_fights(pd.DataFrame(rows))
+    frame["fight_key"] = fight_keys(rows)
+    return frame
+
+def fighters_table(rows: list[dict]) -> pd.DataFrame:
+    frame = normalize_fighters(pd.DataFrame(rows))
+    frame["fighter_key"] = fighter_keys(rows)
+    return frame
+
+def to_arrow(frame: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+    frame = frame.reindex(columns=schema.names)
+    for column in schema.names:
+        if pa.types.is_date32(schema.field(column).type):
+            frame[column] = pd.to_datetime(frame[column]).dt.date
+        elif pa.types.is_string(schema.field(column).type):
+            frame[column] = frame[column].astype(object).where(frame[column].notna(), None).map(
+                lambda value: value if value is None else str(value))
+    return pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+
+def write_file(table: pa.Table, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pq.write_table(table, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+# Drops the rows matching the rewritten event from a compacted year file
+def prune_compacted(path: str, schema: pa.Schema, stale):
+    if not os.path.isfile(path):
+        return
+    table = pq.read_table(path, schema=schema)
+    keep = pc.invert(stale(table))
+    if pc.all(keep).as_py() is False:
+        write_file(table.filter(keep), path)
+
+def event_year(fights: pd.DataFrame) -> int:
+    years = fights["date"].dt.year.dropna()
+    return int(years.iloc[0]) if len(years) else 0
+
+class ParquetSink:
+    def __init__(self, root: str = PARQUET_DIR):
+        self.root = root
+
+    def path(self, dataset: str, year: int, name: str) -> str:
+        return os.path.join(self.root, dataset, f"year={year}", name + ".parquet")
+
+    def write_event(self, event_url: str, fights: list[dict], fighters: list[dict] = ()):
+        if not fights:
+            return
+        name = hashlib.sha1(event_url.encode()).hexdigest()[:16]
+        frame = fights_table(fights)
+        year = event_year(frame)
+        table = to_arrow(frame, FIGHT_SCHEMA)
+        write_file(table, self.path("fights", year, name))
+        events, keys = table["event"].unique(), table["fight_key"].unique()
+        prune_compacted(self.path("fights", year, "part-0"), FIGHT_SCHEMA,
+                        lambda part: pc.or_(pc.is_in(part["event"], events), pc.is_in(part["fight_key"], keys)))
+        if fighters:
+            table = to_arrow(fighters_table(list(fighters)), FIGHTER_SCHEMA)
+            write_file(table, self.path("fighters", year, name))
+            keys = table["fighter_key"].unique()
+            prune_compacted(self.path("fighters", year, "part-0"), FIGHTER_SCHEMA,
+                            lambda part: pc.is_in(part["fighter_key"], keys))
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def dataset(root: str, name: str, schema: pa.Schema) -> ds.Dataset:
+    return ds.dataset(os.path.join(root, name), schema=schema.append(pa.field("year", pa.int16())),
+                      format="parquet", partitioning=PARTITIONING)
+
+# Column and year pruning happen before any data is read
+def read(root: str = PARQUET_DIR, name: str = "fights", columns: list[str] = None,
+         years: list[int] = None) -> pa.Table:
+    schema = FIGHT_SCHEMA if name == "fights" else FIGHTER_SCHEMA
+    where = ds.field("year").isin(years) if years else None
+    return dataset(root, name, schema).to_table(columns=columns, filter=where)
+
+# Fold each year's per-event files into one file, keeping the newest row per key
+def compact(root: str = PARQUET_DIR):
+    for name, schema, key in (("fights", FIGHT_SCHEMA, "fight_key"), ("fighters", FIGHTER_SCHEMA, "fighter_key")):
+        for year_dir in sorted(glob.glob(os.path.join(root, name, "year=*"))):
+            files = sorted(glob.glob(os.path.join(year_dir, "*.parquet")), key=os.path.getmtime)
+            if len(files) < 2:
+                continue
+            frame = pa.concat_tables([pq.read_table(path, schema=schema) for path in files]).to_pandas()
+            frame = frame.drop_duplicates(key, keep="last")
+            write_file(pa.Table.from_pandas(frame, schema=schema, preserve_index=False),
+                       os.path.join(year_dir, "part-0.parquet"))
+            for path in files:
+                if os.path.basename(path) != "part-0.parquet":
+                    os.remove(path)
+
+# Whole-history conversion of existing CSVs, one file per year. Fighters go under the
+# year of their latest fight.
+def backfill(fights_csv: str, fighters_csv: str, root: str = PARQUET_DIR):
+    fights = fights_table(pd.read_csv(fights_csv, dtype=str, keep_default_na=False).to_dict("records"))
+    fights["year"] = fights["date"].dt.year.fillna(0).astype(int)
+    for year, group in fights.groupby("year"):
+        write_file(to_arrow(group, FIGHT_SCHEMA), os.path.join(root, "fights", f"year={year}", "part-0.parquet"))
+
+    if not os.path.isfile(fighters_csv):
+        return
+    fighters = fighters_table(pd.read_csv(fighters_csv, dtype=str, keep_default_na=False).to_dict("records"))
+    latest = pd.concat([
+        fights[[f"fighter_{i}_first_name", f"fighter_{i}_last_name", "year"]]
+        .set_axis(["first_name", "last_name", "year"], axis=1) for i in (0, 1)
+    ]).groupby(["first_name", "last_name"], as_index=False)["year"].max()
+    fighters = fighters.merge(latest, on=["first_name", "last_name"], how="left")
+    fighters["year"] = fighters["year"].fillna(0).astype(int)
+    for year, group in fighters.groupby("year"):
+        write_file(to_arrow(group, FIGHTER_SCHEMA),
+                   os.path.join(root, "fighters", f"year={year}", "part-0.parquet"))
+
+def bench(fights_csv: str, root: str = PARQUET_DIR):
+    start = time.perf_counter()
+    frame = pd.read_csv(fights_csv)
+    recent = frame[pd.to_datetime(frame["date"], format="mixed", errors="coerce").dt.year >= 2020]
+    csv_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    table = read(root, "fights", columns=["fight_key", "date", "method", "fight_time_s"],
+                 years=list(range(2020, 2100)))
+    parquet_time = time.perf_counter() - start
+    print(f"CSV: {csv_time * 1000:.1f} ms ({len(recent)} rows since 2020)")
+    print(f"Parquet: {parquet_time * 1000:.1f} ms ({table.num_rows} rows since 2020)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parquet dataset of the scraped fights and fighters")
+    parser.add_argument("command", choices=["backfill", "compact", "bench"])
+    parser.add_argument("--fights", default="ufc.csv")
+    parser.add_argument("--fighters", default="fighters.csv")
+    parser.add_argument("--root", default=PARQUET_DIR)
+    args = parser.parse_args()
+    if args.command == "backfill":
+        backfill(args.fights, args.fighters, args.root)
+    elif args.command == "compact":
+        compact(args.root)
+    else:
+        bench(args.fights, args.root)
@@ -0,0 +1,122 @@
+# Pre-generated game content, so the server can serve Connect pairs and the daily
+# fighter with a primary-key lookup instead of random walks and full-table sorts.
+#
+#   connect_pairs(id, start_*, end_*, distance, difficulty)  validated Connect pairs
+#   daily_schedule(date, first_name, last_name)              Who's That Fighter answers
+#
+# Both tables go into fighters.db. Every fighter in them resolves to a fighters row in
+# one of the weight classes the game allows, and every pair has a known shortest path.
+import argparse
+import random
+import sqlite3
+from datetime import date, timedelta
+
+import numpy as np
+
+from scraper.graph import GRAPH_DIR
+from scraper.ingest import FIGHTERS_DB, UFC_DB
+from scraper.paths import PathIndex
+from scraper.records import ALLOWED_WEIGHTS
+
+# Shortest-path length -> difficulty; the server's random walk took 3 to 6 steps
+DIFFICULTY = {2: "easy", 3: "easy", 4: "medium", 5: "hard", 6: "hard"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS connect_pairs (
+    id INTEGER PRIMARY KEY,
+    start_first_name TEXT NOT NULL,
+    start_last_name TEXT NOT NULL,
+    end_first_name TEXT NOT NULL,
+    end_last_name TEXT NOT NULL,
+    distance INTEGER NOT NULL,
+    difficulty TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_connect_pairs_difficulty ON connect_pairs(difficulty, id);
+CREATE TABLE IF NOT EXISTS daily_schedule (
+    date TEXT PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Graph IDs of fighters the game can show, with their names
+def eligible_fighters(ufc_db: str, fighters_db: str) -> dict[int, tuple[str, str]]:
+    conn = sqlite3.connect(ufc_db)
+    conn.execute("ATTACH DATABASE ? AS f", (fighters_db,))
+    rows = conn.execute(
+        f"""SELECT g.id, g.first_name, g.last_name FROM fighter_ids g
+            JOIN f.fighters ON fighters.first_name = g.first_name
+                           AND COALESCE(fighters.last_name, '') = g.last_name
+            WHERE fighters.weight IN ({", ".join("?" * len(ALLOWED_WEIGHTS))})
+            GROUP BY g.id""",
+        ALLOWED_WEIGHTS).fetchall()
+    conn.close()
+    return {i: (first_name, last_name) for i, first_name, last_name in rows}
+
+def generate_pairs(index: PathIndex, eligible: dict, pool_size: int, seed: int) -> list[tuple]:
+    ids = np.array(sorted(eligible), dtype=np.int64)
+    distances = np.asarray(index.distances[np.ix_(ids, ids)])
+    starts, ends = np.nonzero(np.isin(distances, list(DIFFICULTY)))
+    rng = np.random.default_rng(seed)
+    chosen = rng.choice(len(starts), size=min(pool_size, len(starts)), replace=False)
+
+    pairs = []
+    for k in chosen:
+        start, end = int(ids[starts[k]]), int(ids[ends[k]])
+        distance = int(distances[starts[k], ends[k]])
+        pairs.append((*eligible[start], *eligible[end], distance, DIFFICULTY[distance]))
+    return pairs
+
+# Dates already scheduled keep their fighter, so regenerating never changes today's answer.
+# A fighter isn't repeated until every eligible fighter has had a day.
+def generate_schedule(conn: sqlite3.Connection, eligible: dict, days: int, seed: int,
+                      start: date = None) -> list[tuple]:
+    start = start or date.today()
+    scheduled = {day: (first_name, last_name) for day, first_name, last_name
+                 in conn.execute("SELECT date, first_name, last_name FROM daily_schedule")}
+    used = set(scheduled.values())
+    names = sorted(set(eligible.values()))
+    random.Random(seed).shuffle(names)
+    queue = [name for name in names if name not in used] or names
+
+    schedule = []
+    for offset in range(days):
+        day = (start + timedelta(days=offset)).isoformat()
+        if day in scheduled:
+            continue
+        if not queue:
+            queue = list(names)
+        schedule.append((day, *queue.pop()))
+    return schedule
+
+def build(ufc_db: str = UFC_DB, fighters_db: str = FIGHTERS_DB, graph_dir: str = GRAPH_DIR,
+          pool_size: int = 5000, days: int = 365, seed: int = 0) -> tuple[int, int]:
+    eligible = eligible_fighters(ufc_db, fighters_db)
+    pairs = generate_pairs(PathIndex(graph_dir), eligible, pool_size, seed)
+
+    conn = sqlite3.connect(fighters_db)
+    conn.executescript(SCHEMA)
+    schedule = generate_schedule(conn, eligible, days, seed)
+    with conn:
+        conn.execute("DELETE FROM connect_pairs")
+        conn.executemany(
+            """INSERT INTO connect_pairs (start_first_name, start_last_name, end_first_name,
+                                          end_last_name, distance, difficulty)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            pairs)
+        conn.executemany("INSERT INTO daily_schedule (date, first_name, last_name) VALUES (?, ?, ?)",
+                         schedule)
+    conn.close()
+    return len(pairs), len(schedule)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate Connect pairs and the daily fighter schedule")
+    parser.add_argument("--ufc-db", default=UFC_DB)
+    parser.add_argument("--fighters-db", default=FIGHTERS_DB)
+    parser.add_argument("--graph-dir", default=GRAPH_DIR)
+    parser.add_argument("--pairs", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    pairs, days = build(args.ufc_db, args.fighters_db, args.graph_dir, args.pairs, args.days, args.seed)
+    print(f"Wrote {pairs} Connect pairs and {days} new daily fighters")
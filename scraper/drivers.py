@@ -0,0 +1,100 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+DRIVER_PATH_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "fight-facts", "chromedriver")
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+# ChromeDriverManager().install() checks the network for a new driver on every call,
+# so the path it returns is remembered on disk. $CHROMEDRIVER overrides it; a cached
+# path that no longer exists (e.g. Chrome updated and the driver was cleared) is
+# looked up again.
+def chromedriver_path() -> str:
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = os.environ.get("CHROMEDRIVER") or cached_driver_path()
+        return _driver_path
+
+def cached_driver_path() -> str:
+    if os.path.isfile(DRIVER_PATH_CACHE):
+        with open(DRIVER_PATH_CACHE, "r") as f:
+            path = f.read().strip()
+        if os.access(path, os.X_OK):
+            return path
+    path = ChromeDriverManager().install()
+    os.makedirs(os.path.dirname(DRIVER_PATH_CACHE), exist_ok=True)
+    with open(DRIVER_PATH_CACHE, "w") as f:
+        f.write(path)
+    return path
+
+# Setup Selenium (https://www.selenium.dev/documentation/webdriver/browsers/chrome/)
+def make_driver(headless: bool = True, driver_path: str = None) -> webdriver.Chrome:
+    options = Options()
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    if headless:
+        options.add_argument("--headless=new")
+    service = Service(driver_path or chromedriver_path())
+    return webdriver.Chrome(service=service, options=options)
+
+# N browsers shared by worker threads. A worker borrows one for a whole task and
+# hands it back, so browsers are reused instead of relaunched per page. Browsers are
+# launched on first use, so building a pool (or never using it) costs nothing.
+# With a tracer, every browser's commands are recorded (scraper.tracing).
+class DriverPool:
+    def __init__(self, size: int, headless: bool = True, tracer=None):
+        self.size = size
+        self.headless = headless
+        self.tracer = tracer
+        self.drivers = []
+        self.launched = 0
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+
+    def borrow(self):
+        with self.lock:
+            launch = self.idle.empty() and self.launched < self.size
+            if launch:
+                self.launched += 1
+        if not launch:
+            return self.idle.get()
+        try:
+            driver = make_driver(self.headless)
+            if self.tracer is not None:
+                self.tracer.wrap(driver)
+        except BaseException:
+            with self.lock:
+                self.launched -= 1
+            raise
+        with self.lock:
+            self.drivers.append(driver)
+        return driver
+
+    @contextmanager
+    def driver(self):
+        driver = self.borrow()
+        try:
+            yield driver
+        finally:
+            self.idle.put(driver)
+
+    def close(self):
+        with self.lock:
+            drivers, self.drivers = self.drivers, []
+        for driver in drivers:
+            driver.quit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,240 @@
+# ESPN scraper (port of ufc_scrape_draft_2.py). The fight cards need JavaScript, so
+# this still drives Chrome, but events are spread over a pool of headless browsers.
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from scraper.drivers import DriverPool
+from scraper.fetch import imap_ordered
+from scraper.ingest import Ingest
+from scraper.metrics import Metrics, Progress, page_type
+from scraper.parsers import espn
+from scraper.profiles import FighterRegistry, ProfileStore
+from scraper.ratelimit import host_key
+from scraper.records import Bout
+from scraper.resilience import Backoff, RetryLog, Resilience
+from scraper.sink import CsvSink
+from scraper.tracing import CommandTracer
+
+main_url = "https://www.espn.com/mma/schedule/_/year/1993/league/ufc"
+
+# Shared by every browser in the pool; main() points the log at retries.jsonl and
+# writes the metrics at the end of the run
+metrics = Metrics()
+resilience = Resilience(metrics=metrics)
+RENDER_BACKOFF = Backoff(base=0.1, cap=2.0)
+
+# Waits for the element, polling every 100 ms. On a timeout the page is refreshed after
+# a jittered backoff, subject to espn.com's retry budget and circuit breaker.
+def retry(driver, class_name: str, max_retries: int = 3, timeout: float = 15):
+    url = driver.current_url
+    for attempt in range(max_retries):
+        started = time.monotonic()
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+                EC.presence_of_element_located((By.CLASS_NAME, class_name)))
+            resilience.succeeded(url)
+            return
+        except TimeoutException as e:
+            delay = resilience.failed(url, attempt, f"timeout waiting for {class_name}", e,
+                                      attempts=max_retries, waited=round(time.monotonic() - started, 3))
+            time.sleep(delay)
+            resilience.host(url)[2].wait()
+            driver.refresh()
+
+# One page_source snapshot parsed in-process instead of a WebDriver call per field.
+# The snapshot is retaken while the page is still rendering (e.g. an empty record),
+# after a short backoff that starts at 100 ms instead of a fixed 2 s.
+def parse_rendered(driver, parser, *args, attempts: int = 8, **kwargs):
+    for attempt in range(attempts):
+        try:
+            return parser(driver.page_source, *args, url=driver.current_url, **kwargs)
+        except (ValueError, IndexError) as e:
+            if attempt == (attempts-1):
+                raise
+            delay = RENDER_BACKOFF.delay(attempt)
+            resilience.record(host_key(driver.current_url), driver.current_url, attempt + 1,
+                              f"{parser.__name__} not rendered ({type(e).__name__})", delay)
+            time.sleep(delay)
+
+# driver.get() plus the wait for class_name, timed as one load of the url's page type.
+# New loads wait out an open espn.com breaker like the refreshes in retry() do.
+def load(driver, url: str, class_name: str, max_retries: int = 3):
+    resilience.host(url)[2].wait()
+    started = time.monotonic()
+    driver.get(url)
+    retry(driver, class_name, max_retries)
+    metrics.observe("page_seconds", time.monotonic() - started, page_type=page_type(url))
+    metrics.inc("pages", host=host_key(url), source="browser")
+
+def get_years(driver) -> list[str]:
+    load(driver, main_url, "event__col")
+    return parse_rendered(driver, espn.parse_years)
+
+def get_event_links(driver, year: str) -> list[str]:
+    load(driver, f"https://www.espn.com/mma/schedule/_/year/{year}/league/ufc", "event__col")
+    return parse_rendered(driver, espn.parse_schedule,
+                          past_only=year.strip() == str(datetime.now().year))
+
+def scrape_fighter(driver, link: str, gender: str) -> dict:
+    with metrics.stage("profile"):
+        load(driver, link, "StatBlockInner__Value")
+        load(driver, parse_rendered(driver, espn.parse_profile), "Bio__Item")
+        return parse_rendered(driver, espn.parse_fighter).as_row(gender)
+
+# Only the overview page is needed to bring a stored fighter's record up to date
+def refresh_record(driver, link: str, stored: dict) -> dict:
+    with metrics.stage("profile"):
+        load(driver, link, "StatBlockInner__Value")
+        wins, losses, draws = parse_rendered(driver, espn.parse_record)
+    return {**stored, "wins": wins, "losses": losses, "draws": draws}
+
+def fight_record(bout: Bout, fighters: list[dict], event_name: str, date: str, location: str) -> dict:
+    names = [(f["first_name"], f["last_name"]) if f else ("", "") for f in fighters]
+    names += [("", "")] * (2 - len(names))
+    return {
+        "fighter_0_first_name": names[0][0],
+        "fighter_0_last_name": names[0][1],
+        "fighter_1_first_name": names[1][0],
+        "fighter_1_last_name": names[1][1],
+        'winner': bout.winner,
+        "event": event_name,
+        "date": date,
+        "location": location,
+        "title": bout.title,
+        "wasDraw": bout.winner == 'draw',
+        "method": bout.method,
+        "rounds": bout.rounds,
+        "fight_time": bout.fight_time,
+        "gender": bout.gender,
+    }
+
+# Expands each card in turn on a single page load, parsing a snapshot after each click
+def scrape_bouts(driver) -> list[Bout]:
+    bouts = []
+    for i in range(parse_rendered(driver, espn.count_bouts)):
+        if (i != 0): driver.find_elements(By.CLASS_NAME, "xOPbW")[i].click()
+        bouts.append(parse_rendered(driver, espn.parse_bout, i))
+    return bouts
+
+# Old draft_2 behaviour: reload the event before every bout (one load per bout)
+def scrape_bouts_reloading(driver, event: str) -> list[Bout]:
+    bouts = []
+    for i in range(parse_rendered(driver, espn.count_bouts)):
+        try:
+            load(driver, event, "n9")
+        except TimeoutException:
+            break
+
+        if (i != 0): driver.find_elements(By.CLASS_NAME, "xOPbW")[i].click()
+        bouts.append(parse_rendered(driver, espn.parse_bout, i))
+    return bouts
+
+# All bouts are read off the event page before any profile is visited, so the
+# event only has to be loaded once. None if the event page never loaded.
+def scrape_event(driver, event: str, registry: FighterRegistry, single_load: bool = True) -> list[dict] | None:
+    try:
+        load(driver, event, "n9")
+    except TimeoutException:
+        metrics.inc("events_failed")
+        return None
+
+    # Date, Location, Event
+    header = parse_rendered(driver, espn.parse_event)
+
+    with metrics.stage("bouts"):
+        bouts = scrape_bouts(driver) if single_load else scrape_bouts_reloading(driver, event)
+
+    fights_data = []
+    roster = []
+    for bout in bouts:
+        fighters = [registry.get_or_scrape(
+                        link,
+                        lambda: (scrape_fighter(driver, link, bout.gender), link),
+                        lambda profile_url, stored: refresh_record(driver, profile_url, stored),
+                        header.date)
+                    for link in bout.fighter_links]
+        fights_data.append(fight_record(bout, fighters, header.name, header.date, header.location))
+        roster += [(link, f"{fighter['first_name']} {fighter['last_name']}".strip(), fighter.get("nickname"))
+                   for link, fighter in zip(bout.fighter_links, fighters)]
+
+    # Every profile seen here feeds the identity resolver used by the ufcstats engine
+    if registry.store is not None:
+        registry.store.add_roster(roster)
+    return fights_data
+
+# Yields (event_url, fights) in schedule order while the pool works ahead
+def scrape(pool: DriverPool, registry: FighterRegistry, single_load: bool = True, skip=None,
+           progress: Progress = None):
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        def on_driver(fn):
+            def task(*args):
+                with pool.driver() as driver:
+                    return fn(driver, *args)
+            return task
+
+        event_links = []
+        year_list = on_driver(get_years)()
+        for events in imap_ordered(executor, on_driver(get_event_links), year_list, pool.size):
+            event_links.extend(events)
+        if skip is not None:
+            event_links = [event for event in event_links if not skip(event)]
+        if progress is not None:
+            progress.total = len(event_links)
+
+        yield from zip(event_links, imap_ordered(
+            executor, on_driver(lambda driver, event: scrape_event(driver, event, registry, single_load)),
+            event_links, pool.size * 2))
+
+def main(workers: int = 4, profiles_db: str = "profiles.db", ingest: bool = False, parquet_dir: str = None,
+         retry_log: str = "retries.jsonl", metrics_path: str = "metrics", trace_path: str = None):
+    resilience.log = RetryLog(retry_log)
+    tracer = CommandTracer() if trace_path else None
+    progress = Progress(metrics)
+    store = ProfileStore(profiles_db)
+    registry = FighterRegistry(store)
+    db = Ingest() if ingest else None
+    parquet = None
+    if parquet_dir:
+        from scraper.columnar import ParquetSink  # pyarrow is only loaded for Parquet output
+        parquet = ParquetSink(parquet_dir)
+    with DriverPool(workers, tracer=tracer) as pool, CsvSink() as sink:
+        for event, fights in scrape(pool, registry, skip=sink.is_done, progress=progress):
+            if fights is None:
+                # Not checkpointed, so the next backfill tries it again
+                print(f"{event}: timed out, left for the next run")
+                progress.tick()
+                continue
+            print(event)
+            fighters = registry.drain()
+            if db is not None:
+                with metrics.stage("ingest"):
+                    db.ingest_event(fights, fighters)
+            if parquet is not None:
+                with metrics.stage("parquet"):
+                    parquet.write_event(event, fights, fighters)
+            with metrics.stage("write"):
+                sink.write_event(event, fights, fighters)
+            metrics.inc("records", len(fights), kind="fights")
+            metrics.inc("records", len(fighters), kind="fighters")
+            progress.tick()
+    store.close()
+    if db is not None:
+        db.close()
+    for line in resilience.log.summary():
+        print(line)
+    resilience.log.close()
+    if metrics_path:
+        metrics.write(metrics_path)
+    if tracer is not None:
+        tracer.write(trace_path)
+
+    print("CSV saved!")
+
+if __name__ == "__main__":
+    main()
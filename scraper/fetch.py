@@ -0,0 +1,117 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scraper.cache import CacheMiss, PageCache
+from scraper.metrics import Metrics, page_type
+from scraper.ratelimit import HostRateLimiter, host_key
+from scraper.resilience import Resilience
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# One keep-alive session per run, so every page to a host reuses the same pooled connections
+def make_session(pool_size: int = 16) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
+# (connect, read): a dead host fails in seconds, a slow page still gets time to arrive
+TIMEOUT = (5, 30)
+
+def fetch(session: requests.Session, url: str, timeout: float = 30) -> str:
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.text
+
+# Ordered map over a thread pool: at most `window` items are in flight and
+# results come back in input order, so output stays deterministic
+def imap_ordered(executor: ThreadPoolExecutor, fn, items, window: int):
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+# Concurrent page fetcher with a cap on requests in flight and a token bucket per host.
+# With a cache, fresh pages are served from disk and stale ones are revalidated with
+# If-None-Match / If-Modified-Since. Offline mode only ever reads the cache. Failed
+# requests are retried through scraper.resilience (backoff, budget, breaker per host).
+class Fetcher:
+    def __init__(self, session: requests.Session = None, max_in_flight: int = 8,
+                 limiter: HostRateLimiter = None, cache: PageCache = None, offline: bool = False,
+                 resilience: Resilience = None, metrics: Metrics = None):
+        self.session = session or make_session(pool_size=max_in_flight)
+        self.max_in_flight = max_in_flight
+        self.limiter = limiter or HostRateLimiter()
+        self.metrics = metrics or Metrics()
+        self.resilience = resilience or Resilience(metrics=self.metrics)
+        self.cache = cache
+        self.offline = offline
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight)
+
+    # revalidate=True skips the TTL and asks the server (conditionally) even for pages
+    # cached for good, which is how change detection rechecks old events
+    def get(self, url: str, revalidate: bool = False) -> str:
+        cached = self.cache.get(url) if self.cache else None
+        host = host_key(url)
+        if self.offline:
+            if cached is None:
+                raise CacheMiss(url)
+            self.metrics.inc("pages", host=host, source="cache")
+            return cached.body
+        if cached and cached.is_fresh() and not revalidate:
+            self.metrics.inc("pages", host=host, source="cache")
+            return cached.body
+
+        headers = {}
+        if cached and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+        started = time.monotonic()
+        with self.metrics.stage("fetch"):
+            response = self.resilience.call(url, lambda: self.request(url, headers))
+        self.metrics.observe("page_seconds", time.monotonic() - started, page_type=page_type(url))
+        if cached and response.status_code == 304:
+            self.metrics.inc("pages", host=host, source="not_modified")
+            return self.cache.touch(cached).body
+        self.metrics.inc("pages", host=host, source="network")
+
+        if self.cache:
+            self.cache.put(url, response.text, response.headers.get("ETag"),
+                           response.headers.get("Last-Modified"))
+        return response.text
+
+    # One attempt; 429s and 5xx raise so the resilience layer can retry them
+    def request(self, url: str, headers: dict) -> requests.Response:
+        self.limiter.acquire(url)
+        response = self.session.get(url, headers=headers, timeout=TIMEOUT)
+        response.raise_for_status()
+        return response
+
+    def map(self, urls, window: int = None, revalidate: bool = False):
+        return imap_ordered(self.executor, lambda url: self.get(url, revalidate), urls,
+                            window or self.max_in_flight)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
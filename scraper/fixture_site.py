@@ -0,0 +1,349 @@
+# Local stand-in for ufcstats.com, ESPN and Bing, so the scraper can be benchmarked
+# with no network. Pages are rendered from the templates in scraper/fixtures (the
+# markup the parsers read, trimmed from the real pages) over a deterministic fake
+# history: `events` cards of `fights` bouts drawn from a roster of fighters, so every
+# event, fight and profile URL is distinct and fighters recur across cards.
+#
+# The server takes the original host as the first path segment
+# (http://127.0.0.1:8000/ufcstats.com/event-details/<id>); LocalSiteAdapter rewrites a
+# session's requests that way, so the engines run unchanged against it. Latency and
+# failures (error statuses, dropped connections) can be injected per request.
+import argparse
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scraper.fetch import make_session
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+FIRST_NAMES = ["Alex", "Belal", "Charles", "Dustin", "Israel", "Jon", "Kamaru", "Leon", "Max", "Sean",
+               "Amanda", "Valentina", "Rose", "Zhang", "Carla", "Tatiana", "Mackenzie", "Jessica",
+               "Islam", "Khabib", "Tony", "Justin", "Robert", "Colby", "Jorge", "Nate", "Henry",
+               "Deiveson", "Brandon", "Alexandre"]
+LAST_NAMES = ["Pereira", "Muhammad", "Oliveira", "Poirier", "Adesanya", "Jones", "Usman", "Edwards",
+              "Holloway", "Strickland", "Nunes", "Shevchenko", "Namajunas", "Weili", "Esparza",
+              "Suarez", "Dern", "Andrade", "Makhachev", "Nurmagomedov", "Ferguson", "Gaethje",
+              "Whittaker", "Covington", "Masvidal", "Diaz", "Cejudo", "Figueiredo", "Moreno", "Pantoja"]
+NICKNAMES = ["Poatan", "Remember the Name", "Do Bronx", "The Diamond", "The Last Stylebender", "Bones",
+             "The Nigerian Nightmare", "Rocky", "Blessed", "Tarzan", "", "", "", ""]
+WEIGHT_CLASSES = ["Flyweight", "Bantamweight", "Featherweight", "Lightweight", "Welterweight",
+                  "Middleweight", "Light Heavyweight", "Heavyweight"]
+WOMENS_CLASSES = ["Strawweight", "Flyweight", "Bantamweight"]
+METHODS = ["KO/TKO", "Submission", "Decision - Unanimous", "Decision - Split", "Decision - Majority",
+           "TKO - Doctor's Stoppage"]
+REFEREES = ["Herb Dean", "Marc Goddard", "Jason Herzog", "Keith Peterson", "Mike Beltran"]
+LOCATIONS = ["Las Vegas, Nevada, USA", "Abu Dhabi, Abu Dhabi, United Arab Emirates",
+             "Newark, New Jersey, USA", "London, England, United Kingdom", "Sydney, New South Wales, Australia"]
+STANCES = ["Orthodox", "Southpaw", "Switch"]
+
+ESPN_FIGHTER_IDS = 3000000
+
+# The newest event; the rest go back two weeks at a time
+LAST_EVENT = date(2025, 6, 28)
+
+_templates = {}
+
+def template(fixture: str) -> Template:
+    if fixture not in _templates:
+        with open(os.path.join(FIXTURE_DIR, fixture + ".html"), "r", encoding="utf-8") as f:
+            _templates[fixture] = Template(f.read())
+    return _templates[fixture]
+
+def render(fixture: str, **values) -> str:
+    return template(fixture).substitute(values)
+
+def ident(kind: str, i: int) -> str:
+    return hashlib.sha1(f"{kind}:{i}".encode()).hexdigest()[:16]
+
+class FixtureSite:
+    def __init__(self, events: int = 20, fights: int = 12, roster: int = None, seed: int = 0):
+        rng = random.Random(seed)
+        roster = min(roster or max(2 * fights, events * fights // 2), len(FIRST_NAMES) * len(LAST_NAMES))
+        self.fighters = []
+        for i in range(roster):
+            # Distinct (first, last) pairs for up to len(FIRST_NAMES) * len(LAST_NAMES) fighters
+            first = FIRST_NAMES[i % len(FIRST_NAMES)]
+            last = LAST_NAMES[(i + i // len(FIRST_NAMES)) % len(LAST_NAMES)]
+            self.fighters.append({
+                "first_name": first,
+                "last_name": last,
+                "name": f"{first} {last}",
+                "slug": f"{first}-{last}".lower(),
+                "nickname": rng.choice(NICKNAMES),
+                "ufc_id": ident("fighter", i),
+                "espn_id": ESPN_FIGHTER_IDS + i,
+                "record": f"{rng.randint(8, 30)}-{rng.randint(0, 10)}-{rng.randint(0, 2)}",
+                "height": f"{rng.randint(5, 6)}' {rng.randint(0, 11)}\"",
+                "weight": f"{rng.choice([125, 135, 145, 155, 170, 185, 205, 245])} lbs",
+                "reach": f"{rng.randint(64, 84)}\"",
+                "stance": rng.choice(STANCES),
+                "birthdate": f"{rng.randint(1, 12)}/{rng.randint(1, 28)}/{rng.randint(1980, 2002)}",
+            })
+
+        self.events = []
+        for i in range(events):
+            day = LAST_EVENT - timedelta(days=14 * i)
+            cards = []
+            for j in range(fights):
+                women = rng.random() < 0.15
+                cards.append({
+                    "ufc_id": ident("fight", i * fights + j),
+                    "fighters": rng.sample(range(roster), 2),
+                    "winner": rng.choices([0, 1, None], [0.49, 0.49, 0.02])[0],
+                    "method": rng.choice(METHODS),
+                    "round": rng.randint(1, 5 if j == 0 else 3),
+                    "time": f"{rng.randint(0, 4)}:{rng.randint(0, 59):02}",
+                    "women": women,
+                    "weight_class": rng.choice(WOMENS_CLASSES if women else WEIGHT_CLASSES),
+                    "title": j == 0 and rng.random() < 0.3,
+                    "referee": rng.choice(REFEREES),
+                })
+            self.events.append({
+                "ufc_id": ident("event", i),
+                "espn_id": 600000000 + i,
+                "name": f"UFC Fight Night {events - i}: {self.fighters[cards[0]['fighters'][0]]['last_name']} "
+                        f"vs. {self.fighters[cards[0]['fighters'][1]]['last_name']}",
+                "date": day,
+                "location": rng.choice(LOCATIONS),
+                "fights": cards,
+            })
+
+        self.event_by_ufc_id = {event["ufc_id"]: event for event in self.events}
+        self.event_by_espn_id = {str(event["espn_id"]): event for event in self.events}
+        self.fight_by_ufc_id = {fight["ufc_id"]: (event, fight) for event in self.events for fight in event["fights"]}
+        self.fighter_by_espn_id = {str(fighter["espn_id"]): fighter for fighter in self.fighters}
+        self.fighter_by_name = {fighter["name"].lower(): fighter for fighter in self.fighters}
+        # A fighter's bio shows the division of their first fight here
+        self.weight_classes = {}
+        for event in reversed(self.events):
+            for fight in event["fights"]:
+                for i in fight["fighters"]:
+                    self.weight_classes.setdefault(
+                        i, ("Women's " if fight["women"] else "") + fight["weight_class"])
+
+        self.routes = [
+            (r"^/ufcstats\.com/statistics/events/completed", self.ufcstats_events),
+            (r"^/ufcstats\.com/event-details/(\w+)", self.ufcstats_event),
+            (r"^/ufcstats\.com/fight-details/(\w+)", self.ufcstats_fight),
+            (r"^/www\.bing\.com/search", self.bing_search),
+            (r"^/www\.espn\.com/mma/schedule/_/year/(\d+)", self.espn_schedule),
+            (r"^/www\.espn\.com/mma/fightcenter/_/id/(\d+)", self.espn_fightcard),
+            (r"^/www\.espn\.com/mma/fighter/bio/_/id/(\d+)", self.espn_bio),
+            (r"^/www\.espn\.com/mma/fighter/_/id/(\d+)", self.espn_fighter),
+        ]
+
+    # (status, body) for a path in the server's /<host>/<path> form
+    def page(self, path: str, query: dict = None) -> tuple[int, str]:
+        for pattern, handler in self.routes:
+            match = re.match(pattern, path)
+            if match:
+                try:
+                    return 200, handler(*match.groups(), query=query or {})
+                except KeyError:
+                    break
+        return 404, "<html><body>Not Found</body></html>"
+
+    def ufcstats_events(self, query: dict) -> str:
+        rows = "".join(render("ufcstats_events_row", event_id=event["ufc_id"], event_name=event["name"],
+                              date=f"{event['date']:%B %d, %Y}", location=event["location"])
+                       for event in self.events)
+        return render("ufcstats_events", rows=rows)
+
+    def ufcstats_event(self, event_id: str, query: dict) -> str:
+        event = self.event_by_ufc_id[event_id]
+        rows = []
+        for fight in event["fights"]:
+            fighter_0, fighter_1 = (self.fighters[i] for i in fight["fighters"])
+            rows.append(render("ufcstats_event_row", fight_id=fight["ufc_id"],
+                               fighter_0_id=fighter_0["ufc_id"], fighter_0=fighter_0["name"],
+                               fighter_1_id=fighter_1["ufc_id"], fighter_1=fighter_1["name"],
+                               weight_class=fight["weight_class"], method=fight["method"],
+                               round=fight["round"], time=fight["time"]))
+        return render("ufcstats_event", event_name=event["name"], date=f"{event['date']:%B %d, %Y}",
+                      location=event["location"], rows="".join(rows))
+
+    def ufcstats_fight(self, fight_id: str, query: dict) -> str:
+        event, fight = self.fight_by_ufc_id[fight_id]
+        fighter_0, fighter_1 = (self.fighters[i] for i in fight["fighters"])
+        status = ("D", "D") if fight["winner"] is None else ("W", "L") if fight["winner"] == 0 else ("L", "W")
+        bout = f"UFC {'Women' + chr(39) + 's ' if fight['women'] else ''}{fight['weight_class']} " \
+               f"{'Title ' if fight['title'] else ''}Bout"
+        nickname = lambda fighter: f'"{fighter["nickname"]}"' if fighter["nickname"] else ""
+        return render("ufcstats_fight", event_id=event["ufc_id"], event_name=event["name"],
+                      status_0=status[0], status_1=status[1],
+                      fighter_0_id=fighter_0["ufc_id"], fighter_0=fighter_0["name"], nickname_0=nickname(fighter_0),
+                      fighter_1_id=fighter_1["ufc_id"], fighter_1=fighter_1["name"], nickname_1=nickname(fighter_1),
+                      bout=bout, method=fight["method"], round=fight["round"], time=fight["time"],
+                      referee=fight["referee"])
+
+    # Queries look like "+site:espn.com First Last Nickname mma fighter profile"
+    def bing_search(self, query: dict) -> str:
+        q = query.get("q", [""])[0]
+        terms = q.split()
+        fighter = self.fighter_by_name.get(" ".join(terms[1:3]).lower(), self.fighters[0])
+        return render("bing_search", query=q, name=fighter["name"], slug=fighter["slug"],
+                      espn_id=fighter["espn_id"])
+
+    def espn_schedule(self, year: str, query: dict) -> str:
+        years = sorted({event["date"].year for event in self.events})
+        options = "".join(f'          <option class="dropdown__option" value="{y}">{y}</option>\n'
+                          for y in range(years[0], years[-1] + 1))
+        rows = "".join(render("espn_schedule_row", short_date=f"{event['date']:%b %d}",
+                              espn_event_id=event["espn_id"], event_name=event["name"],
+                              location=event["location"])
+                       for event in self.events if str(event["date"].year) == year)
+        return render("espn_schedule", year=year, years=options,
+                      tables=render("espn_schedule_table", title="Past Results", rows=rows))
+
+    def espn_fightcard(self, event_id: str, query: dict) -> str:
+        event = self.event_by_espn_id[event_id]
+        bouts = []
+        arrow = '<svg class="MMACompetitor__arrow" aria-hidden="true"></svg>'
+        for fight in event["fights"]:
+            fighter_0, fighter_1 = (self.fighters[i] for i in fight["fighters"])
+            note = f"{'Women' + chr(39) + 's ' if fight['women'] else ''}{fight['weight_class']}" \
+                   f"{' - Title Fight' if fight['title'] else ''}"
+            bouts.append(render("espn_bout", note=note, method=fight["method"], round=fight["round"],
+                                time=fight["time"],
+                                espn_id_0=fighter_0["espn_id"], slug_0=fighter_0["slug"],
+                                fighter_0=fighter_0["name"], record_0=fighter_0["record"],
+                                arrow_0=arrow if fight["winner"] == 0 else "",
+                                espn_id_1=fighter_1["espn_id"], slug_1=fighter_1["slug"],
+                                fighter_1=fighter_1["name"], record_1=fighter_1["record"],
+                                arrow_1=arrow if fight["winner"] == 1 else ""))
+        return render("espn_fightcard", event_name=event["name"], long_date=f"{event['date']:%A, %B %d, %Y}",
+                      location=event["location"], bouts="".join(bouts))
+
+    def espn_fighter(self, fighter_id: str, query: dict) -> str:
+        fighter = self.fighter_by_espn_id[fighter_id]
+        return render("espn_fighter", **{key: fighter[key] for key in
+                                         ("name", "first_name", "last_name", "record", "espn_id", "slug")})
+
+    def espn_bio(self, fighter_id: str, query: dict) -> str:
+        fighter = self.fighter_by_espn_id[fighter_id]
+        weight_class = self.weight_classes.get(fighter["espn_id"] - ESPN_FIGHTER_IDS, "Lightweight")
+        return render("espn_bio", weight_class=weight_class, **fighter)
+
+class Faults:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, fail_rate: float = 0.0,
+                 fail_status: int = 503, drop_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.drop_rate = drop_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    # "ok", "fail" or "drop" for the next request, plus how long to stall first
+    def next(self) -> tuple[str, float]:
+        with self.lock:
+            roll = self.rng.random()
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+        if roll < self.drop_rate:
+            return "drop", delay
+        if roll < self.drop_rate + self.fail_rate:
+            return "fail", delay
+        return "ok", delay
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, site: FixtureSite, faults: Faults = None, port: int = 0):
+        super().__init__(("127.0.0.1", port), FixtureHandler)
+        self.site = site
+        self.faults = faults or Faults()
+        self.counts = {"ok": 0, "fail": 0, "drop": 0}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "FixtureServer":
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real sites
+
+    def do_GET(self):
+        outcome, delay = self.server.faults.next()
+        with self.server.lock:
+            self.server.counts[outcome] += 1
+        time.sleep(delay)
+        if outcome == "drop":
+            self.close_connection = True
+            return
+        if outcome == "fail":
+            status, body = self.server.faults.fail_status, "<html><body>Service Unavailable</body></html>"
+        else:
+            parts = urlsplit(self.path)
+            status, body = self.server.site.page(parts.path, parse_qs(parts.query))
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+# Sends every request to the fixture server instead of its real host
+class LocalSiteAdapter(HTTPAdapter):
+    def __init__(self, base_url: str, **kwargs):
+        self.base_url = base_url.rstrip("/")
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = f"{self.base_url}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+        return super().send(request, **kwargs)
+
+def local_session(base_url: str, pool_size: int = 16) -> requests.Session:
+    session = make_session(pool_size)
+    adapter = LocalSiteAdapter(base_url, pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the fixture site locally")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--fights", type=int, default=12)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many more seconds, at random")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with --fail-status")
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of connections closed without a response")
+    args = parser.parse_args()
+    server = FixtureServer(FixtureSite(args.events, args.fights),
+                           Faults(args.latency, args.jitter, args.fail_rate, args.fail_status, args.drop_rate),
+                           args.port)
+    print(f"Serving on {server.url} (e.g. {server.url}/ufcstats.com/statistics/events/completed)")
+    server.serve_forever()
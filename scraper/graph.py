@@ -0,0 +1,99 @@
+# Fighter graph compiler. Run once per data release (after ingest): gives every
+# fighter in the ufc table a canonical integer ID, writes an edges table for
+# opponent lookups, and exports the same graph as compressed-sparse-row arrays.
+#
+#   fighter_ids(id, first_name, last_name)    ids are 0..N-1, ordered by name
+#   edges(fighter_id, opponent_id, fight_id)  one row per fight per direction
+#   <out_dir>/offsets.npy, neighbors.npy      neighbors[offsets[i]:offsets[i + 1]]
+#                                             are fighter i's distinct opponents
+import argparse
+import os
+import sqlite3
+
+import numpy as np
+
+from scraper.ingest import UFC_DB, fight_fingerprint, full_name
+
+GRAPH_DIR = os.path.join("shared", "graph")
+
+SCHEMA = """
+DROP TABLE IF EXISTS edges;
+DROP TABLE IF EXISTS fighter_ids;
+CREATE TABLE fighter_ids (
+    id INTEGER PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    UNIQUE (first_name, last_name)
+);
+CREATE TABLE edges (
+    fighter_id INTEGER NOT NULL,
+    opponent_id INTEGER NOT NULL,
+    fight_id TEXT NOT NULL,
+    PRIMARY KEY (fighter_id, opponent_id, fight_id)
+) WITHOUT ROWID;
+CREATE INDEX idx_edges_fight ON edges(fight_id);
+"""
+
+def read_fights(conn: sqlite3.Connection) -> list[tuple]:
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(ufc)")]
+    fight_id = "fight_id" if "fight_id" in columns else "NULL"
+    return conn.execute(
+        f"""SELECT {fight_id}, date, fighter0_first_name, COALESCE(fighter0_last_name, ''),
+                   fighter1_first_name, COALESCE(fighter1_last_name, '')
+            FROM ufc""").fetchall()
+
+def to_csr(num_fighters: int, pairs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Both directions, self-loops dropped, duplicate rematches collapsed
+    both = np.concatenate([pairs, pairs[:, ::-1]])
+    both = both[both[:, 0] != both[:, 1]]
+    both = np.unique(both, axis=0)  # sorted by source, then neighbor
+    offsets = np.zeros(num_fighters + 1, dtype=np.int32)
+    np.cumsum(np.bincount(both[:, 0], minlength=num_fighters), out=offsets[1:])
+    return offsets, both[:, 1].astype(np.int32)
+
+def build_graph(ufc_db: str = UFC_DB, out_dir: str = GRAPH_DIR) -> tuple[np.ndarray, np.ndarray]:
+    conn = sqlite3.connect(ufc_db)
+    fights = read_fights(conn)
+
+    names = sorted({(f0, l0) for _, _, f0, l0, _, _ in fights} | {(f1, l1) for _, _, _, _, f1, l1 in fights})
+    ids = {name: i for i, name in enumerate(names)}
+
+    edges = []
+    pairs = np.empty((len(fights), 2), dtype=np.int32)
+    for row, (fight_id, date, f0, l0, f1, l1) in enumerate(fights):
+        fight_id = fight_id or fight_fingerprint(date or "", full_name(f0, l0), full_name(f1, l1))
+        a, b = ids[(f0, l0)], ids[(f1, l1)]
+        pairs[row] = (a, b)
+        edges.append((a, b, fight_id))
+        edges.append((b, a, fight_id))
+
+    # One transaction: readers see the old graph or the new one, never a mix
+    with conn:
+        conn.executescript("BEGIN;" + SCHEMA)
+        conn.executemany("INSERT INTO fighter_ids (id, first_name, last_name) VALUES (?, ?, ?)",
+                         [(i, first, last) for (first, last), i in ids.items()])
+        conn.executemany("INSERT OR IGNORE INTO edges (fighter_id, opponent_id, fight_id) VALUES (?, ?, ?)",
+                         edges)
+    conn.close()
+
+    offsets, neighbors = to_csr(len(names), pairs)
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, "offsets.npy"), offsets)
+    np.save(os.path.join(out_dir, "neighbors.npy"), neighbors)
+    return offsets, neighbors
+
+# Memory-maps the exported arrays; nothing is read until a row is touched
+def load_csr(out_dir: str = GRAPH_DIR) -> tuple[np.ndarray, np.ndarray]:
+    return (np.load(os.path.join(out_dir, "offsets.npy"), mmap_mode="r"),
+            np.load(os.path.join(out_dir, "neighbors.npy"), mmap_mode="r"))
+
+def opponents(offsets: np.ndarray, neighbors: np.ndarray, fighter_id: int) -> np.ndarray:
+    return neighbors[offsets[fighter_id]:offsets[fighter_id + 1]]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the fighter graph from the ufc table")
+    parser.add_argument("--ufc-db", default=UFC_DB)
+    parser.add_argument("--out-dir", default=GRAPH_DIR)
+    args = parser.parse_args()
+    offsets, neighbors = build_graph(args.ufc_db, args.out_dir)
+    print(f"{len(offsets) - 1} fighters, {len(neighbors) // 2} opponent pairs written to {args.out_dir}")
@@ -0,0 +1,101 @@
+# Local fighter-identity resolver. Matches a ufcstats name (first, last, nickname)
+# to an ESPN profile URL using an in-memory index over the ESPN roster, instead of a
+# Bing search per fighter. Bing stays as the fallback for names it can't place.
+import argparse
+from collections import defaultdict
+from datetime import datetime
+
+from scraper.cache import PageCache
+from scraper.fetch import Fetcher
+from scraper.names import ngrams, normalize
+from scraper.parsers import espn
+from scraper.profiles import ProfileStore
+
+class IdentityResolver:
+    # entries: (profile_url, name, nickname)
+    def __init__(self, entries: list[tuple[str, str, str]], threshold: float = 0.85):
+        self.threshold = threshold
+        self.entries = []
+        self.exact = defaultdict(list)
+        self.postings = defaultdict(set)
+        for profile_url, name, nickname in entries:
+            key = normalize(name)
+            if not key:
+                continue
+            grams = ngrams(key)
+            i = len(self.entries)
+            self.entries.append((profile_url, key, normalize(nickname), grams))
+            self.exact[key].append(i)
+            for gram in grams:
+                self.postings[gram].add(i)
+
+    @classmethod
+    def from_store(cls, store: ProfileStore, **kwargs) -> "IdentityResolver":
+        return cls(store.roster(), **kwargs)
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Returns (profile_url, confidence); profile_url is None below the threshold
+    def resolve(self, first_name: str, last_name: str, nickname: str = "") -> tuple[str | None, float]:
+        key = normalize(f"{first_name} {last_name}")
+        nickname = normalize(nickname)
+
+        # Exact name match, with the nickname breaking ties between namesakes
+        matches = self.exact.get(key, [])
+        if len(matches) > 1 and nickname:
+            matches = [i for i in matches if self.entries[i][2] == nickname] or matches
+        if len(matches) == 1:
+            return self.entries[matches[0]][0], 1.0
+
+        # Fuzzy match: Jaccard similarity of character trigrams, over entries sharing any
+        grams = ngrams(key)
+        candidates = set().union(*(self.postings.get(gram, ()) for gram in grams)) if grams else set()
+        scored = []
+        for i in candidates:
+            profile_url, _, entry_nickname, entry_grams = self.entries[i]
+            score = len(grams & entry_grams) / len(grams | entry_grams)
+            if nickname and entry_nickname == nickname:
+                score = min(1.0, score + 0.1)
+            scored.append((score, profile_url))
+        if not scored:
+            return None, 0.0
+
+        scored.sort(reverse=True)
+        best, profile_url = scored[0]
+        # Two near-identical candidates (or exact namesakes) are too ambiguous to trust
+        if len(scored) > 1 and best - scored[1][0] < 0.05:
+            best /= 2
+        return (profile_url if best >= self.threshold else None), best
+
+def schedule_url(year: int) -> str:
+    return f"https://www.espn.com/mma/schedule/_/year/{year}/league/ufc"
+
+# Bulk roster harvest: every competitor on every ESPN event page, over plain HTTP
+def harvest_roster(fetcher: Fetcher, store: ProfileStore, years: list[int]) -> int:
+    event_links = []
+    schedule_urls = [schedule_url(year) for year in years]
+    for url, page in zip(schedule_urls, fetcher.map(schedule_urls)):
+        event_links.extend(espn.parse_schedule(page, url))
+
+    harvested = 0
+    for url, page in zip(event_links, fetcher.map(event_links)):
+        competitors = espn.parse_competitors(page, url)
+        store.add_roster([(link, name, None) for name, link in competitors])
+        harvested += len(competitors)
+    return harvested
+
+def main(profiles_db: str = "profiles.db", first_year: int = 1993, cache_dir: str = ".page_cache"):
+    store = ProfileStore(profiles_db)
+    with Fetcher(cache=PageCache(cache_dir) if cache_dir else None) as fetcher:
+        harvested = harvest_roster(fetcher, store, list(range(first_year, datetime.now().year + 1)))
+    print(f"Harvested {harvested} competitor entries, roster has {len(store.roster())} fighters")
+    store.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Harvest the ESPN fighter roster for local identity resolution")
+    parser.add_argument("--profiles-db", default="profiles.db")
+    parser.add_argument("--first-year", type=int, default=1993)
+    parser.add_argument("--cache-dir", default=".page_cache")
+    args = parser.parse_args()
+    main(args.profiles_db, args.first_year, args.cache_dir)
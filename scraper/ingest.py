@@ -0,0 +1,301 @@
+# Incremental load of scraped events into the databases the server reads
+# (shared/ufcSQL.db and shared/fighters.db). Replaces makeSQL.ipynb's full
+# to_sql(if_exists="replace") rebuild: each event is upserted with executemany in
+# one transaction spanning both files (fighters.db is ATTACHed), so a reader never
+# sees half an event. Fights are keyed on a fingerprint of date + both fighters.
+#
+# A DB built by makeSQL.ipynb needs a one-off migration first (fight_id and its
+# unique index, '' for single-name fighters' last_name). It deletes duplicate rows, so
+# it never runs on its own: `python -m scraper migrate` reports what it would change
+# and `--apply` does it. Until then Ingest refuses to open the DBs.
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+
+from scraper.profiles import parse_event_date
+
+UFC_DB = os.path.join("shared", "ufcSQL.db")
+FIGHTERS_DB = os.path.join("shared", "fighters.db")
+
+FIGHT_COLUMNS = ["fight_id", "fighter0_first_name", "fighter0_last_name", "fighter1_first_name",
+                 "fighter1_last_name", "winner", "event", "date", "location", "gender", "weight",
+                 "title", "wasDraw", "method", "rounds", "fight_time"]
+
+# Per-fighter columns copied onto each ufc row as fighter0_* / fighter1_*
+FIGHTER_STAT_COLUMNS = ["nickname", "wins", "losses", "draws", "height", "weight", "reach",
+                        "stance", "birth_date"]
+
+FIGHTER_COLUMNS = ["first_name", "last_name", "nickname", "wins", "losses", "draws", "height",
+                   "weight", "reach", "stance", "birth_date", "total_fights"]
+
+def full_name(first_name: str, last_name: str) -> str:
+    return f"{first_name or ''} {last_name or ''}".strip().lower()
+
+# Event dates as the DB spells them ("February 22, 2025"), whichever site they came
+# from; left as they are if they don't parse
+def db_date(date: str) -> str:
+    parsed = parse_event_date(date) if date else None
+    return parsed.strftime("%B %d, %Y") if parsed else date
+
+# Same fight, same ID, whichever corner each fighter was listed in and whichever
+# site's date format it came with (the date is hashed as ISO)
+def fight_fingerprint(date: str, name_0: str, name_1: str) -> str:
+    parsed = parse_event_date(date) if date else None
+    day = parsed.strftime("%Y-%m-%d") if parsed else date.strip()
+    names = sorted([name_0.strip().lower(), name_1.strip().lower()])
+    return hashlib.sha1(f"{day}|{names[0]}|{names[1]}".encode("utf-8")).hexdigest()
+
+def event_timestamp(date: str) -> float | None:
+    parsed = parse_event_date(date) if date else None
+    return parsed.timestamp() if parsed else None
+
+# ESPN's "155 lbs" (or the whole HT/WT "5' 11\", 155 lbs") -> the DB's "155 lbs."
+def weight_text(weight) -> str | None:
+    match = re.search(r"(\d+)\s*lbs", str(weight or ""))
+    return f"{match.group(1)} lbs." if match else None
+
+# ESPN's "6/23/1999" -> the DB's "Jun 23, 1999"; None if it doesn't parse
+def birth_date_text(date) -> str | None:
+    parsed = parse_event_date(re.sub(r"\s*\(.*\)$", "", str(date))) if date else None
+    return parsed.strftime("%b %d, %Y") if parsed else None
+
+# Scraped fighter row (see Fighter.as_row) -> fighters table row
+def fighter_row(fighter: dict) -> tuple:
+    wins, losses, draws = (int(fighter.get(k) or 0) for k in ("wins", "losses", "draws"))
+    return (
+        fighter["first_name"],
+        fighter.get("last_name") or "",
+        fighter.get("nickname") or None,
+        wins, losses, draws,
+        fighter.get("height") or None,
+        weight_text(fighter.get("weight")),
+        fighter.get("reach") or None,
+        fighter.get("stance") or None,
+        birth_date_text(fighter.get("birth_date") or fighter.get("birthdate")),
+        wins + losses + draws,
+    )
+
+class NeedsMigration(Exception):
+    pass
+
+UFC_INDEXES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_ufc_fight_id ON ufc(fight_id)",
+    "CREATE INDEX IF NOT EXISTS idx_ufc_fighter0_name ON ufc(fighter0_first_name, fighter0_last_name)",
+    "CREATE INDEX IF NOT EXISTS idx_ufc_fighter1_name ON ufc(fighter1_first_name, fighter1_last_name)",
+]
+FIGHTER_INDEXES = ["CREATE INDEX IF NOT EXISTS f.idx_fighters_name ON fighters(first_name, last_name)"]
+
+class Ingest:
+    def __init__(self, ufc_db: str = UFC_DB, fighters_db: str = FIGHTERS_DB, check: bool = True):
+        self.conn = sqlite3.connect(ufc_db)
+        self.conn.create_function("event_ts", 1, event_timestamp, deterministic=True)
+        self.conn.execute("ATTACH DATABASE ? AS f", (fighters_db,))
+        self.create()
+        if check and any(self.plan().values()):
+            self.conn.close()
+            raise NeedsMigration(f"{ufc_db} and {fighters_db} need a one-off migration before ingesting; "
+                                 "`python -m scraper migrate` shows what it changes")
+
+    def columns(self, table: str, schema: str = "main") -> list[str]:
+        return [row[1] for row in self.conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+    def indexes(self, schema: str = "main") -> set[str]:
+        return {row[0] for row in self.conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type = 'index'")}
+
+    # Tables for fresh DBs only; an existing table is left to migrate()
+    def create(self):
+        with self.conn:
+            if not self.columns("ufc"):
+                self.conn.execute(f"""CREATE TABLE ufc ({", ".join(
+                    FIGHT_COLUMNS + [f"fighter{i}_{c}" for i in (0, 1) for c in FIGHTER_STAT_COLUMNS])})""")
+                for statement in UFC_INDEXES:
+                    self.conn.execute(statement)
+            if not self.columns("fighters", "f"):
+                self.conn.execute("""CREATE TABLE f.fighters (
+                    first_name TEXT, last_name TEXT, nickname TEXT,
+                    wins INTEGER DEFAULT 0, losses INTEGER DEFAULT 0, draws INTEGER DEFAULT 0,
+                    height TEXT, weight TEXT, reach TEXT, stance TEXT, birth_date TEXT,
+                    last_fight_date TEXT, total_fights INTEGER DEFAULT 0,
+                    PRIMARY KEY (first_name, last_name))""")
+                for statement in FIGHTER_INDEXES:
+                    self.conn.execute(statement)
+
+    # What migrate() would change, without changing anything
+    def plan(self) -> dict:
+        existing = self.columns("ufc")
+        fingerprinted = "fight_id" in existing
+        rows = self.conn.execute(
+            f"""SELECT rowid, {"fight_id" if fingerprinted else "NULL"}, date, event,
+                       fighter0_first_name, fighter0_last_name, fighter1_first_name, fighter1_last_name
+                FROM ufc ORDER BY rowid""").fetchall()
+        kept, duplicates, fingerprints, dates = set(), [], [], []
+        for rowid, fight_id, date, event, f0, l0, f1, l1 in rows:
+            # Missing, or hashed from the raw date string by an earlier version
+            expected = fight_fingerprint(date or "", full_name(f0, l0), full_name(f1, l1))
+            if expected in kept:
+                duplicates.append((rowid, date, event, full_name(f0, l0), full_name(f1, l1)))
+                continue
+            kept.add(expected)
+            if fight_id != expected:
+                fingerprints.append((expected, rowid))
+            if date and db_date(date) != date:
+                dates.append((db_date(date), rowid))
+        last_fight_dates = [(db_date(date), rowid) for rowid, date in self.conn.execute(
+            "SELECT rowid, last_fight_date FROM f.fighters WHERE last_fight_date IS NOT NULL")
+            if db_date(date) != date]
+
+        # NULL never conflicts in a primary key, so single-name fighters use ''. Where
+        # both spellings exist (or NULL twice), the '' (or first) row is kept.
+        null_last_names = self.conn.execute(
+            "SELECT COUNT(*) FROM f.fighters WHERE last_name IS NULL").fetchone()[0]
+        shadowed = self.conn.execute(
+            """SELECT rowid, first_name FROM f.fighters AS n WHERE last_name IS NULL
+                 AND EXISTS (SELECT 1 FROM f.fighters AS o WHERE o.first_name = n.first_name
+                             AND (o.last_name = '' OR (o.last_name IS NULL AND o.rowid < n.rowid)))
+               ORDER BY rowid""").fetchall()
+        return {
+            "missing_columns": [column for column in FIGHT_COLUMNS if column not in existing],
+            "fingerprints": fingerprints,
+            "duplicate_fights": duplicates,
+            "dates": dates,
+            "last_fight_dates": last_fight_dates,
+            "null_last_names": null_last_names,
+            "shadowed_fighters": shadowed,
+            "missing_indexes": sorted({"idx_ufc_fight_id", "idx_ufc_fighter0_name", "idx_ufc_fighter1_name"}
+                                      - self.indexes())
+                               + sorted({"idx_fighters_name"} - self.indexes("f")),
+        }
+
+    # Brings a DB built by makeSQL.ipynb up to what the ingest needs. Deletes the rows
+    # listed in plan(), so it only runs from `python -m scraper migrate --apply`.
+    def migrate(self) -> dict:
+        plan = self.plan()
+        with self.conn:
+            for column in plan["missing_columns"]:
+                self.conn.execute(f"ALTER TABLE ufc ADD COLUMN {column} TEXT")
+
+            # Duplicates from earlier appends go first, so the unique index can be built
+            self.conn.executemany("DELETE FROM ufc WHERE rowid = ?",
+                                  [(row[0],) for row in plan["duplicate_fights"]])
+            self.conn.executemany("UPDATE ufc SET fight_id = ? WHERE rowid = ?", plan["fingerprints"])
+            self.conn.executemany("UPDATE ufc SET date = ? WHERE rowid = ?", plan["dates"])
+            self.conn.executemany("UPDATE f.fighters SET last_fight_date = ? WHERE rowid = ?",
+                                  plan["last_fight_dates"])
+
+            self.conn.executemany("DELETE FROM f.fighters WHERE rowid = ?",
+                                  [(row[0],) for row in plan["shadowed_fighters"]])
+            self.conn.execute("UPDATE f.fighters SET last_name = '' WHERE last_name IS NULL")
+
+            for statement in UFC_INDEXES + FIGHTER_INDEXES:
+                self.conn.execute(statement)
+        return plan
+
+    def fighter_stats(self, first_name: str, last_name: str) -> list:
+        row = self.conn.execute(
+            f"""SELECT {", ".join(FIGHTER_STAT_COLUMNS)} FROM f.fighters
+                WHERE first_name = ? AND last_name = ?""",
+            (first_name, last_name or "")).fetchone()
+        return list(row) if row else [None] * len(FIGHTER_STAT_COLUMNS)
+
+    # fights are rows shaped like fight_record(); fighters like Fighter.as_row()
+    def ingest_event(self, fights: list[dict], fighters: list[dict] = ()):
+        with self.conn:
+            self.conn.executemany(
+                f"""INSERT INTO f.fighters ({", ".join(FIGHTER_COLUMNS)})
+                    VALUES ({", ".join("?" * len(FIGHTER_COLUMNS))})
+                    ON CONFLICT(first_name, last_name) DO UPDATE SET
+                      nickname = COALESCE(excluded.nickname, nickname),
+                      wins = excluded.wins, losses = excluded.losses, draws = excluded.draws,
+                      height = COALESCE(excluded.height, height),
+                      weight = COALESCE(excluded.weight, weight),
+                      reach = COALESCE(excluded.reach, reach),
+                      stance = COALESCE(excluded.stance, stance),
+                      birth_date = COALESCE(excluded.birth_date, birth_date),
+                      total_fights = excluded.total_fights""",
+                [fighter_row(fighter) for fighter in fighters])
+
+            rows = []
+            for fight in fights:
+                names = [(fight[f"fighter_{i}_first_name"], fight[f"fighter_{i}_last_name"] or "")
+                         for i in (0, 1)]
+                date = db_date(fight["date"])
+                fight_id = fight_fingerprint(date, full_name(*names[0]), full_name(*names[1]))
+                rows.append([
+                    fight_id, *names[0], *names[1], fight["winner"], fight["event"], date,
+                    fight["location"], fight.get("gender"), fight.get("weight"), int(bool(fight["title"])),
+                    int(fight["winner"] == "draw"), fight["method"], fight["rounds"], fight["fight_time"],
+                    *self.fighter_stats(*names[0]), *self.fighter_stats(*names[1]),
+                ])
+
+            columns = FIGHT_COLUMNS + [f"fighter{i}_{c}" for i in (0, 1) for c in FIGHTER_STAT_COLUMNS]
+            self.conn.executemany(
+                f"""INSERT INTO ufc ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})
+                    ON CONFLICT(fight_id) DO UPDATE SET
+                      {", ".join(f"{c} = excluded.{c}" for c in columns[1:])}""",
+                rows)
+
+            # Bump last_fight_date for everyone on this card
+            self.conn.executemany(
+                """UPDATE f.fighters SET last_fight_date = ?
+                   WHERE first_name = ? AND last_name = ?
+                     AND (last_fight_date IS NULL OR event_ts(last_fight_date) < event_ts(?))""",
+                [(db_date(fight["date"]), fight[f"fighter_{i}_first_name"], fight[f"fighter_{i}_last_name"] or "",
+                  fight["date"]) for fight in fights for i in (0, 1)])
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Loads a whole ufc.csv (and optionally fighters.csv) event by event
+def main(fights_csv: str, fighters_csv: str = None, ufc_db: str = UFC_DB, fighters_db: str = FIGHTERS_DB):
+    import pandas as pd  # only the CSV load needs it
+    fights_df = pd.read_csv(fights_csv, keep_default_na=False)
+    fighters = pd.read_csv(fighters_csv, keep_default_na=False).to_dict("records") if fighters_csv else []
+    with Ingest(ufc_db, fighters_db) as ingest:
+        if fighters:
+            ingest.ingest_event([], fighters)
+        for _, event_df in fights_df.groupby(["event", "date"], sort=False):
+            ingest.ingest_event(event_df.to_dict("records"))
+    print(f"Ingested {len(fights_df)} fights into {ufc_db}")
+
+# Dry run unless apply: lists every row the migration would delete
+def migrate(ufc_db: str = UFC_DB, fighters_db: str = FIGHTERS_DB, apply: bool = False):
+    with Ingest(ufc_db, fighters_db, check=False) as ingest:
+        plan = ingest.migrate() if apply else ingest.plan()
+    verb = "" if apply else "would be "
+    if not any(plan.values()):
+        print(f"{ufc_db} and {fighters_db} are already migrated")
+        return
+    if plan["missing_columns"]:
+        print(f"ufc: {', '.join(plan['missing_columns'])} {verb}added")
+    print(f"ufc: {len(plan['fingerprints'])} rows {verb}(re)fingerprinted, "
+          f"{len(plan['duplicate_fights'])} duplicate rows {verb}deleted")
+    for rowid, date, event, name_0, name_1 in plan["duplicate_fights"]:
+        print(f"  rowid {rowid}: {date} {event}: {name_0} vs {name_1}")
+    if plan["dates"] or plan["last_fight_dates"]:
+        print(f"dates {verb}rewritten as \"February 22, 2025\": {len(plan['dates'])} in ufc, "
+              f"{len(plan['last_fight_dates'])} last_fight_date in fighters")
+    print(f"fighters: {plan['null_last_names']} NULL last names {verb}set to '', "
+          f"{len(plan['shadowed_fighters'])} rows {verb}deleted in favour of an existing '' row")
+    for rowid, first_name in plan["shadowed_fighters"]:
+        print(f"  rowid {rowid}: {first_name}")
+    if plan["missing_indexes"]:
+        print(f"indexes {verb}created: {', '.join(plan['missing_indexes'])}")
+    if not apply:
+        print("Nothing was changed; rerun with --apply to migrate")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Upsert scraped CSVs into the SQLite databases")
+    parser.add_argument("fights_csv", nargs="?", default="ufc.csv")
+    parser.add_argument("--fighters-csv")
+    parser.add_argument("--ufc-db", default=UFC_DB)
+    parser.add_argument("--fighters-db", default=FIGHTERS_DB)
+    args = parser.parse_args()
+    main(args.fights_csv, args.fighters_csv, args.ufc_db, args.fighters_db)
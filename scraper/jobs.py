@@ -0,0 +1,412 @@
+# Job-queue mode for the ESPN backfill, so it can be spread over several processes
+# and machines and resumed after any of them dies. The queue is a SQLite file:
+#
+#   python -m scraper.jobs seed              one "years" job; the rest fan out from it
+#   python -m scraper.jobs work --workers 2  claim and run jobs until the queue drains
+#   python -m scraper.jobs status            counts per kind and state, recent failures
+#   python -m scraper.jobs retry             put permanently failed jobs back in line
+#   python -m scraper.jobs merge             write finished events to ufc.csv etc.
+#
+# Jobs cascade: years -> year (a schedule page) -> event (a fight card) -> fighter
+# (profile + bio). A job's follow-ups are enqueued in the same transaction that marks
+# it done, and (kind, key) is unique, so every fighter is scraped once however many
+# cards they're on. Workers claim a job under a lease and renew it with heartbeats;
+# a lease that runs out (the worker died or hung) is reclaimed by the next claim. A
+# failed job is logged in `failures` and retried after a backoff, up to max_attempts.
+#
+# For several machines, put the queue on a shared filesystem with working POSIX locks
+# (every claim is a short write transaction) and run `work` on each; `merge` then
+# runs once, anywhere, and can be repeated as more events finish.
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict
+
+from scraper.resilience import Backoff
+
+QUEUE_DB = "jobs.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    payload TEXT NOT NULL DEFAULT '{}',
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    not_before REAL NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    UNIQUE (kind, key)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (state, priority, id);
+CREATE TABLE IF NOT EXISTS failures (
+    job_id INTEGER NOT NULL,
+    worker TEXT,
+    attempt INTEGER NOT NULL,
+    error TEXT,
+    failed_at REAL NOT NULL
+);
+"""
+
+# Lower runs first: fighters unblock merging events that are already scraped, and
+# events before schedules keeps the backlog of leased-out work short
+PRIORITIES = {"fighter": 0, "event": 1, "year": 2, "years": 3}
+
+class JobQueue:
+    def __init__(self, path: str = QUEUE_DB, max_attempts: int = 5, backoff: Backoff = None):
+        self.conn = sqlite3.connect(path, timeout=60, check_same_thread=False, isolation_level=None)
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.max_attempts = max_attempts
+        self.backoff = backoff or Backoff(base=30.0, cap=1800.0)
+
+    # BEGIN IMMEDIATE takes the write lock up front, so two workers can't both read
+    # the same pending job before either marks it leased
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def enqueue(self, jobs: list[tuple[str, str, dict]], conn: sqlite3.Connection = None) -> int:
+        rows = [(kind, key, PRIORITIES[kind], json.dumps(payload or {}), time.time())
+                for kind, key, payload in jobs]
+        sql = """INSERT OR IGNORE INTO jobs (kind, key, priority, payload, updated_at)
+                 VALUES (?, ?, ?, ?, ?)"""
+        if conn is not None:
+            return conn.executemany(sql, rows).rowcount
+        with self.transaction() as conn:
+            return conn.executemany(sql, rows).rowcount
+
+    # Leases that ran out go back to pending (or fail for good), logged as a failure
+    def reclaim(self, conn: sqlite3.Connection, now: float):
+        expired = conn.execute("SELECT id, worker, attempts FROM jobs WHERE state = 'leased' AND lease_until < ?",
+                               (now,)).fetchall()
+        for job_id, worker, attempts in expired:
+            conn.execute("INSERT INTO failures (job_id, worker, attempt, error, failed_at) VALUES (?, ?, ?, ?, ?)",
+                         (job_id, worker, attempts, "lease expired", now))
+            conn.execute("""UPDATE jobs SET state = ?, worker = NULL, lease_until = NULL, error = ?,
+                                            updated_at = ? WHERE id = ?""",
+                         ("failed" if attempts >= self.max_attempts else "pending", "lease expired", now, job_id))
+
+    # The next runnable job as (id, kind, key, payload), leased to `worker`, or None
+    def claim(self, worker: str, lease: float = 300.0) -> tuple[int, str, str, dict] | None:
+        now = time.time()
+        with self.transaction() as conn:
+            self.reclaim(conn, now)
+            row = conn.execute("""SELECT id, kind, key, payload FROM jobs
+                                  WHERE state = 'pending' AND not_before <= ?
+                                  ORDER BY priority, id LIMIT 1""", (now,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("""UPDATE jobs SET state = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1,
+                                            updated_at = ? WHERE id = ?""", (worker, now + lease, now, row[0]))
+        return row[0], row[1], row[2], json.loads(row[3])
+
+    # False if the lease was lost (it expired and another worker took the job)
+    def heartbeat(self, job_id: int, worker: str, lease: float = 300.0) -> bool:
+        now = time.time()
+        with self.transaction() as conn:
+            return conn.execute("""UPDATE jobs SET lease_until = ?, updated_at = ?
+                                   WHERE id = ? AND worker = ? AND state = 'leased'""",
+                                (now + lease, now, job_id, worker)).rowcount == 1
+
+    def complete(self, job_id: int, worker: str, result, follow_ups: list[tuple[str, str, dict]] = ()) -> bool:
+        now = time.time()
+        with self.transaction() as conn:
+            owned = conn.execute("""UPDATE jobs SET state = 'done', result = ?, error = NULL, lease_until = NULL,
+                                                    updated_at = ?
+                                    WHERE id = ? AND worker = ? AND state = 'leased'""",
+                                 (json.dumps(result), now, job_id, worker)).rowcount == 1
+            if owned and follow_ups:
+                self.enqueue(list(follow_ups), conn)
+        return owned
+
+    def fail(self, job_id: int, worker: str, error: str):
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute("SELECT attempts FROM jobs WHERE id = ? AND worker = ? AND state = 'leased'",
+                               (job_id, worker)).fetchone()
+            if row is None:
+                return  # the lease was lost; the new owner decides
+            attempts = row[0]
+            conn.execute("INSERT INTO failures (job_id, worker, attempt, error, failed_at) VALUES (?, ?, ?, ?, ?)",
+                         (job_id, worker, attempts, error, now))
+            conn.execute("""UPDATE jobs SET state = ?, worker = NULL, lease_until = NULL, error = ?,
+                                            not_before = ?, updated_at = ? WHERE id = ?""",
+                         ("failed" if attempts >= self.max_attempts else "pending", error,
+                          now + self.backoff.delay(attempts), now, job_id))
+
+    # Permanently failed jobs get a fresh set of attempts
+    def retry_failed(self, kind: str = None) -> int:
+        with self.transaction() as conn:
+            return conn.execute("""UPDATE jobs SET state = 'pending', attempts = 0, not_before = 0, updated_at = ?
+                                   WHERE state = 'failed' AND (? IS NULL OR kind = ?)""",
+                                (time.time(), kind, kind)).rowcount
+
+    # Jobs that are pending or leased, i.e. the queue hasn't drained yet
+    def active(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM jobs WHERE state IN ('pending', 'leased')").fetchone()[0]
+
+    def counts(self) -> dict:
+        with self.lock:
+            rows = self.conn.execute("SELECT kind, state, COUNT(*) FROM jobs GROUP BY kind, state").fetchall()
+        counts = {}
+        for kind, state, count in rows:
+            counts.setdefault(kind, {})[state] = count
+        return counts
+
+    def failures(self, limit: int = 20) -> list[tuple]:
+        with self.lock:
+            return self.conn.execute("""SELECT jobs.kind, jobs.key, failures.worker, failures.attempt,
+                                               failures.error, failures.failed_at
+                                        FROM failures JOIN jobs ON jobs.id = failures.job_id
+                                        ORDER BY failures.failed_at DESC LIMIT ?""", (limit,)).fetchall()
+
+    # (key, payload, result) of finished jobs of one kind
+    def done(self, kind: str) -> list[tuple[str, dict, object]]:
+        with self.lock:
+            rows = self.conn.execute("SELECT key, payload, result FROM jobs WHERE kind = ? AND state = 'done' ORDER BY id",
+                                     (kind,)).fetchall()
+        return [(key, json.loads(payload), json.loads(result)) for key, payload, result in rows]
+
+    def states(self, kind: str) -> dict:
+        with self.lock:
+            return dict(self.conn.execute("SELECT key, state FROM jobs WHERE kind = ?", (kind,)).fetchall())
+
+    def close(self):
+        self.conn.close()
+
+# Job handlers: (driver, key, payload) -> (result, follow-up jobs)
+def run_years(driver, key: str, payload: dict):
+    from scraper import espn
+    years = espn.get_years(driver)
+    return years, [("year", year.strip(), {}) for year in years]
+
+def run_year(driver, key: str, payload: dict):
+    from scraper import espn
+    links = espn.get_event_links(driver, key)
+    return links, [("event", link, {"year": int(key), "order": i}) for i, link in enumerate(links)]
+
+def run_event(driver, key: str, payload: dict):
+    from scraper import espn
+    from scraper.parsers import espn as parsers
+    espn.load(driver, key, "n9")
+    header = espn.parse_rendered(driver, parsers.parse_event)
+    with espn.metrics.stage("bouts"):
+        bouts = espn.scrape_bouts(driver)
+    result = {"name": header.name, "date": header.date, "location": header.location,
+              "bouts": [asdict(bout) for bout in bouts]}
+    return result, [("fighter", link, {"gender": bout.gender}) for bout in bouts for link in bout.fighter_links]
+
+def run_fighter(driver, key: str, payload: dict):
+    from scraper import espn
+    return espn.scrape_fighter(driver, key, payload["gender"]), []
+
+HANDLERS = {"years": run_years, "year": run_year, "event": run_event, "fighter": run_fighter}
+
+# Renews the lease on every job this process holds until stopped
+class Heartbeat:
+    def __init__(self, queue: JobQueue, worker: str, lease: float):
+        self.queue = queue
+        self.worker = worker
+        self.lease = lease
+        self.held = set()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopped.wait(self.lease / 3):
+            with self.lock:
+                held = list(self.held)
+            for job_id in held:
+                if not self.queue.heartbeat(job_id, self.worker, self.lease):
+                    print(f"lost the lease on job {job_id}")
+                    self.release(job_id)
+
+    def hold(self, job_id: int):
+        with self.lock:
+            self.held.add(job_id)
+
+    def release(self, job_id: int):
+        with self.lock:
+            self.held.discard(job_id)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+# One thread per browser in the pool, each claiming jobs until nothing is pending or
+# leased anywhere (a leased job elsewhere may still fan out more work, so idle
+# threads poll instead of exiting)
+def work(queue: JobQueue, pool, worker: str = None, lease: float = 300.0, poll: float = 10.0,
+         handlers: dict = None) -> dict:
+    worker = worker or worker_id()
+    handlers = handlers or HANDLERS
+    counts = {"done": 0, "failed": 0}
+    counts_lock = threading.Lock()
+
+    def loop(heartbeat: Heartbeat):
+        while True:
+            job = queue.claim(worker, lease)
+            if job is None:
+                if not queue.active():
+                    return
+                time.sleep(poll)
+                continue
+            job_id, kind, key, payload = job
+            heartbeat.hold(job_id)
+            try:
+                with pool.driver() as driver:
+                    result, follow_ups = handlers[kind](driver, key, payload)
+            except Exception as e:
+                queue.fail(job_id, worker, f"{type(e).__name__}: {e}")
+                outcome = "failed"
+            else:
+                queue.complete(job_id, worker, result, follow_ups)
+                outcome = "done"
+            finally:
+                heartbeat.release(job_id)
+            with counts_lock:
+                counts[outcome] += 1
+            print(f"{outcome}: {kind} {key}")
+
+    with Heartbeat(queue, worker, lease) as heartbeat:
+        threads = [threading.Thread(target=loop, args=(heartbeat,)) for _ in range(pool.size)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return counts
+
+# Finished events whose fighters are all done, in schedule order, through the same
+# sinks as a normal run. Events already in the CSV checkpoint are skipped, so merge
+# can run as often as you like while workers are still going.
+def merge(queue: JobQueue, profiles_db: str = "profiles.db", ingest: bool = False, parquet_dir: str = None) -> dict:
+    from scraper.espn import fight_record
+    from scraper.ingest import Ingest
+    from scraper.profiles import ProfileStore
+    from scraper.records import Bout
+    from scraper.sink import CsvSink
+
+    fighters = {key: row for key, _, row in queue.done("fighter")}
+    fighter_states = queue.states("fighter")
+    events = sorted(queue.done("event"), key=lambda event: (event[1]["year"], event[1]["order"]))
+    store = ProfileStore(profiles_db) if profiles_db else None
+    db = Ingest() if ingest else None
+    parquet = None
+    if parquet_dir:
+        from scraper.columnar import ParquetSink  # pyarrow is only loaded for Parquet output
+        parquet = ParquetSink(parquet_dir)
+    counts = {"merged": 0, "waiting": 0, "blocked": 0, "already": 0}
+    with CsvSink() as sink:
+        for event_url, _, event in events:
+            if sink.is_done(event_url):
+                counts["already"] += 1
+                continue
+            bouts = [Bout(**bout) for bout in event["bouts"]]
+            links = [link for bout in bouts for link in bout.fighter_links]
+            missing = [link for link in links if link not in fighters]
+            if missing:
+                # Failed fighters block the event until `retry`; others are still running
+                blocked = any(fighter_states.get(link) == "failed" for link in missing)
+                counts["blocked" if blocked else "waiting"] += 1
+                continue
+
+            fights = [fight_record(bout, [fighters[link] for link in bout.fighter_links],
+                                   event["name"], event["date"], event["location"]) for bout in bouts]
+            event_fighters = list({link: fighters[link] for link in links}.values())
+            if store is not None:
+                for link in dict.fromkeys(links):
+                    store.put(link, fighters[link], link)
+                store.add_roster([(link, f"{fighters[link]['first_name']} {fighters[link]['last_name']}".strip(),
+                                   fighters[link].get("nickname")) for link in dict.fromkeys(links)])
+            if db is not None:
+                db.ingest_event(fights, event_fighters)
+            if parquet is not None:
+                parquet.write_event(event_url, fights, event_fighters)
+            sink.write_event(event_url, fights, event_fighters)
+            counts["merged"] += 1
+    if store is not None:
+        store.close()
+    if db is not None:
+        db.close()
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sharded ESPN backfill over a leased job queue")
+    parser.add_argument("--db", default=QUEUE_DB, help="the queue; shared by every worker")
+    parser.add_argument("--max-attempts", type=int, default=5)
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    subcommands.add_parser("seed", help="enqueue the backfill (safe to repeat)")
+    command = subcommands.add_parser("work", help="claim and run jobs until the queue drains")
+    command.add_argument("--workers", type=int, default=2, help="browsers in this process")
+    command.add_argument("--lease", type=float, default=300.0, help="seconds before a silent worker's job is reclaimed")
+    command.add_argument("--retry-log", default="retries.jsonl")
+    command.add_argument("--metrics", default="metrics",
+                         help="write run metrics to METRICS.json and METRICS.prom; pass '' to skip")
+    subcommands.add_parser("status", help="job counts and recent failures")
+    command = subcommands.add_parser("retry", help="give permanently failed jobs another go")
+    command.add_argument("--kind", choices=list(PRIORITIES))
+    command = subcommands.add_parser("merge", help="write finished events to ufc.csv / fighters.csv")
+    command.add_argument("--profiles-db", default="profiles.db",
+                         help="also store each fighter's profile; pass '' to skip")
+    command.add_argument("--ingest", action="store_true",
+                         help="also upsert each event into shared/ufcSQL.db and shared/fighters.db")
+    command.add_argument("--parquet", metavar="DIR",
+                         help="also write each event to a Parquet dataset partitioned by year")
+    args = parser.parse_args()
+
+    queue = JobQueue(args.db, args.max_attempts)
+    if args.command == "seed":
+        from scraper.espn import main_url
+        queue.enqueue([("years", main_url, {})])
+    elif args.command == "work":
+        from scraper import espn
+        from scraper.drivers import DriverPool
+        from scraper.resilience import RetryLog
+        espn.resilience.log = RetryLog(args.retry_log)
+        with DriverPool(args.workers) as pool:
+            counts = work(queue, pool, lease=args.lease)
+        print(f"{counts['done']} jobs done, {counts['failed']} failed")
+        espn.resilience.log.close()
+        if args.metrics:
+            espn.metrics.write(args.metrics)
+    elif args.command == "retry":
+        print(f"{queue.retry_failed(args.kind)} jobs back in the queue")
+    elif args.command == "merge":
+        counts = merge(queue, args.profiles_db, args.ingest, args.parquet)
+        print(f"{counts['merged']} events merged, {counts['already']} already merged, "
+              f"{counts['waiting']} waiting on fighters, {counts['blocked']} blocked by failed fighters")
+    if args.command in ("seed", "status", "retry"):
+        for kind, states in sorted(queue.counts().items(), key=lambda item: PRIORITIES[item[0]]):
+            print(f"{kind:8} " + ", ".join(f"{count} {state}" for state, count in sorted(states.items())))
+    if args.command == "status":
+        for kind, key, worker, attempt, error, failed_at in queue.failures():
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(failed_at))} {kind} {key} "
+                  f"attempt {attempt} on {worker}: {error}")
+    queue.close()
@@ -0,0 +1,183 @@
+# Fingerprint-based dedup and merge for ufc.csv / fighters.csv.
+#
+# Every row gets an identity key (a fight: date + both fighters; a fighter: their
+# name) and a content digest (sha1 over its non-empty fields). Each CSV has a sidecar
+# index, ufc.csv.keys, with a "key<TAB>digest" line per row written; a key's last line
+# is its current digest. New and changed rows are appended and an unchanged one is
+# skipped, so a rerun or a stale last_scraped_event.txt costs a dict lookup per row
+# instead of a reload and drop_duplicates over the whole file. The rows a changed row
+# superseded are dropped by one rewrite when the table is closed (or, after a crash,
+# opened), using the index kept in memory, so the file holds one row per key.
+#
+# Rows are written in the file's header order. Columns the file lacks (one draft's
+# wasDraw, another's bio fields) widen the header; that rewrite and the compaction
+# are the only O(file) paths.
+import argparse
+import csv
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from scraper.ingest import fight_fingerprint, full_name
+from scraper.normalize import dates
+
+def content_digest(row: dict) -> str:
+    fields = {column: str(value) for column, value in row.items()
+              if value is not None and value == value and str(value) != ""}
+    return hashlib.sha1(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+
+def fight_keys(rows: list[dict]) -> list[str]:
+    # ufcstats and ESPN spell dates differently, so the key uses the ISO date
+    raw = pd.Series([row.get("date") for row in rows], dtype=object)
+    iso = dates(raw).dt.strftime("%Y-%m-%d").fillna(raw.fillna("").astype(str))
+    return [fight_fingerprint(date,
+                              full_name(row.get("fighter_0_first_name"), row.get("fighter_0_last_name")),
+                              full_name(row.get("fighter_1_first_name"), row.get("fighter_1_last_name")))
+            for date, row in zip(iso, rows)]
+
+def fighter_keys(rows: list[dict]) -> list[str]:
+    return [hashlib.sha1(full_name(row.get("first_name"), row.get("last_name")).encode()).hexdigest()
+            for row in rows]
+
+class CsvTable:
+    def __init__(self, path: str, keys):
+        self.path = path
+        self.index_path = path + ".keys"
+        self.key_rows = keys
+        self.header = self.read_header()
+        self.rows = []     # (key, digest) per row, in file order
+        self.written = {}  # key -> digest of the key's current (last) row
+        self.superseded = 0
+        if not self.header and os.path.isfile(self.index_path):
+            os.remove(self.index_path)  # the CSV was deleted, so its index is stale
+        elif os.path.isfile(self.index_path):
+            with open(self.index_path, "r") as f:
+                for line in f:
+                    key, _, digest = line.rstrip("\n").partition("\t")
+                    if digest:  # skip a torn last line
+                        self.track([(key, digest)])
+            self.compact()  # superseded rows left by a run that didn't close
+        elif self.header:
+            self.reindex()
+
+    def read_header(self) -> list[str]:
+        if not os.path.isfile(self.path) or os.path.getsize(self.path) == 0:
+            return []
+        with open(self.path, "r", newline="") as f:
+            return next(csv.reader(f), [])
+
+    def read(self) -> pd.DataFrame:
+        return pd.read_csv(self.path, dtype=str, keep_default_na=False)
+
+    def track(self, rows: list[tuple[str, str]]):
+        for key, digest in rows:
+            self.superseded += key in self.written
+            self.written[key] = digest
+        self.rows += rows
+
+    def write_index(self):
+        with open(self.index_path + ".tmp", "w") as f:
+            f.writelines(f"{key}\t{digest}\n" for key, digest in self.rows)
+        os.replace(self.index_path + ".tmp", self.index_path)
+
+    def rewrite(self, frame: pd.DataFrame):
+        tmp = self.path + ".tmp"
+        frame.to_csv(tmp, index=False)
+        os.replace(tmp, self.path)
+
+    # Keys and digests every row of the file. One-off for a CSV written before the
+    # index existed, a deleted index, or one that no longer lines up with its file.
+    def reindex(self):
+        rows = self.read().to_dict("records")
+        self.rows, self.written, self.superseded = [], {}, 0
+        self.track([(key, content_digest(row)) for row, key in zip(rows, self.key_rows(rows))])
+        self.write_index()
+
+    # Drops the rows a later row with the same key superseded. The index says which
+    # rows those are, so nothing is re-keyed; run once per run from close().
+    def compact(self):
+        if not self.superseded:
+            return
+        frame = self.read()
+        if len(frame) != len(self.rows):
+            self.reindex()
+            if not self.superseded:
+                return
+        last = {key: i for i, (key, _) in enumerate(self.rows)}
+        keep = sorted(last.values())
+        self.rewrite(frame.iloc[keep])
+        self.rows = [self.rows[i] for i in keep]
+        self.superseded = 0
+        self.write_index()
+
+    def sizes(self) -> dict:
+        return {path: os.path.getsize(path) if os.path.isfile(path) else 0
+                for path in (self.path, self.index_path)}
+
+    # New or changed rows only, with their keys and digests. Duplicates within the
+    # batch collapse to the last one.
+    def select(self, rows: list[dict]) -> list[tuple[dict, str, str]]:
+        batch = {}
+        for row, key in zip(rows, self.key_rows(rows)):
+            digest = content_digest(row)
+            if self.written.get(key) != digest:
+                batch[key] = (row, key, digest)
+            else:
+                batch.pop(key, None)
+        return list(batch.values())
+
+    # Schema reconciliation: existing columns keep their place, new ones go on the end
+    def widen(self, rows: list[dict]):
+        columns = list(self.header)
+        for row in rows:
+            columns += [column for column in row if column not in columns]
+        if columns == self.header:
+            return
+        if self.header:
+            self.rewrite(self.read().reindex(columns=columns))
+        self.header = columns
+
+    # New and changed rows alike go on the end; a changed row supersedes its key's
+    # earlier row, which stays in the file until compact()
+    def append(self, selected: list[tuple[dict, str, str]]):
+        if not selected:
+            return
+        rows = [row for row, _, _ in selected]
+        self.widen(rows)
+        with open(self.path, "a", newline="") as f:
+            pd.DataFrame(rows).reindex(columns=self.header).to_csv(f, index=False, header=f.tell() == 0)
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self.index_path, "a") as f:
+            f.writelines(f"{key}\t{digest}\n" for _, key, digest in selected)
+            f.flush()
+            os.fsync(f.fileno())
+        self.track([(key, digest) for _, key, digest in selected])
+
+    def close(self):
+        self.compact()
+
+def merge_files(target: str, sources: list[str], keys) -> tuple[int, int]:
+    table = CsvTable(target, keys)
+    seen = added = 0
+    for source in sources:
+        rows = pd.read_csv(source, dtype=str, keep_default_na=False).to_dict("records")
+        selected = table.select(rows)
+        table.append(selected)
+        seen += len(rows)
+        added += len(selected)
+    table.close()
+    return seen, added
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Merge CSVs from earlier runs or drafts into ufc.csv / fighters.csv without duplicates")
+    parser.add_argument("kind", choices=["fights", "fighters"])
+    parser.add_argument("target", help="e.g. ufc.csv")
+    parser.add_argument("sources", nargs="+")
+    args = parser.parse_args()
+    seen, added = merge_files(args.target, args.sources,
+                              fight_keys if args.kind == "fights" else fighter_keys)
+    print(f"{added} of {seen} rows were new or changed; merged into {args.target}")
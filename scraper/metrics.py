@@ -0,0 +1,194 @@
+# Run metrics: counters (pages per host and source, retries, records written), time
+# per stage, latency histograms per page type, and a progress line with throughput
+# and ETA. Written at the end of a run as metrics.json and metrics.prom (Prometheus
+# text format), for setting rate limits and catching slow nightly runs.
+#
+# Stage times are summed over worker threads, so with 8 workers "fetch" can exceed
+# the wall-clock duration of the run.
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Seconds; the last bucket is +Inf
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PAGE_TYPES = [
+    (r"ufcstats\.com/statistics/events", "ufcstats.events"),
+    (r"ufcstats\.com/event-details/", "ufcstats.event"),
+    (r"ufcstats\.com/fight-details/", "ufcstats.fight"),
+    (r"espn\.com/mma/schedule", "espn.schedule"),
+    (r"espn\.com/mma/fightcenter", "espn.event"),
+    (r"espn\.com/mma/fighter/bio", "espn.bio"),
+    (r"espn\.com/mma/fighter", "espn.fighter"),
+    (r"bing\.com/search", "bing.search"),
+]
+
+def page_type(url: str) -> str:
+    for pattern, name in PAGE_TYPES:
+        if re.search(pattern, url or ""):
+            return name
+    return "other"
+
+class Histogram:
+    def __init__(self, buckets: tuple = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    # Cumulative counts per upper bound, Prometheus style
+    def cumulative(self) -> list[tuple[str, int]]:
+        total = 0
+        out = []
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            total += count
+            out.append((bound, total))
+        return out
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        for bound, (_, total) in zip(self.buckets, self.cumulative()):
+            if total >= q * self.count:
+                return bound
+        return float("inf")
+
+def labels_key(labels: dict) -> tuple:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def prom_labels(key: tuple, **extra) -> str:
+    pairs = [*key, *extra.items()]
+    if not pairs:
+        return ""
+    escape = lambda value: str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in pairs) + "}"
+
+class Metrics:
+    def __init__(self):
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.stages = defaultdict(lambda: [0.0, 0])
+        self.histograms = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        with self.lock:
+            self.counters[(name, labels_key(labels))] += value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = (name, labels_key(labels))
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].observe(seconds)
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            with self.lock:
+                self.stages[name][0] += elapsed
+                self.stages[name][1] += 1
+
+    def total(self, name: str, **labels) -> float:
+        with self.lock:
+            return sum(value for (counter, key), value in self.counters.items()
+                       if counter == name and set(labels_key(labels)) <= set(key))
+
+    def to_json(self) -> dict:
+        with self.lock:
+            return {
+                "started_at": self.started,
+                "duration_s": round(time.time() - self.started, 3),
+                "counters": [{"name": name, "labels": dict(key), "value": value}
+                             for (name, key), value in sorted(self.counters.items())],
+                "stages": {name: {"seconds": round(seconds, 3), "calls": calls}
+                           for name, (seconds, calls) in sorted(self.stages.items())},
+                "histograms": [{"name": name, "labels": dict(key), "count": h.count, "sum": round(h.sum, 3),
+                                "p50": h.quantile(0.5), "p95": h.quantile(0.95),
+                                "buckets": dict(h.cumulative())}
+                               for (name, key), h in sorted(self.histograms.items())],
+            }
+
+    def to_prometheus(self, prefix: str = "scraper") -> str:
+        lines = []
+        with self.lock:
+            by_name = defaultdict(list)
+            for (name, key), value in sorted(self.counters.items()):
+                by_name[name].append((key, value))
+            for name, series in by_name.items():
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                lines += [f"{prefix}_{name}_total{prom_labels(key)} {value:g}" for key, value in series]
+
+            lines.append(f"# TYPE {prefix}_stage_seconds_total counter")
+            lines += [f'{prefix}_stage_seconds_total{{stage="{name}"}} {seconds:.3f}'
+                      for name, (seconds, _) in sorted(self.stages.items())]
+            lines.append(f"# TYPE {prefix}_stage_calls_total counter")
+            lines += [f'{prefix}_stage_calls_total{{stage="{name}"}} {calls}'
+                      for name, (_, calls) in sorted(self.stages.items())]
+
+            by_name = defaultdict(list)
+            for (name, key), h in sorted(self.histograms.items()):
+                by_name[name].append((key, h))
+            for name, series in by_name.items():
+                lines.append(f"# TYPE {prefix}_{name} histogram")
+                for key, h in series:
+                    lines += [f"{prefix}_{name}_bucket{prom_labels(key, le=bound)} {total}"
+                              for bound, total in h.cumulative()]
+                    lines.append(f"{prefix}_{name}_sum{prom_labels(key)} {h.sum:.3f}")
+                    lines.append(f"{prefix}_{name}_count{prom_labels(key)} {h.count}")
+
+            lines.append(f"# TYPE {prefix}_run_seconds gauge")
+            lines.append(f"{prefix}_run_seconds {time.time() - self.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+    # <path>.json and <path>.prom, each written to a temp file and renamed
+    def write(self, path: str = "metrics"):
+        for suffix, body in ((".json", json.dumps(self.to_json(), indent=2)), (".prom", self.to_prometheus())):
+            with open(path + suffix + ".tmp", "w") as f:
+                f.write(body)
+            os.replace(path + suffix + ".tmp", path + suffix)
+
+# Prints "[12/120 events] 2.1 events/min, 14.3 pages/s, ETA 0:51:20" at most every
+# `interval` seconds. total can be filled in once the event list is known.
+class Progress:
+    def __init__(self, metrics: Metrics, total: int = None, interval: float = 10.0, unit: str = "events"):
+        self.metrics = metrics
+        self.total = total
+        self.interval = interval
+        self.unit = unit
+        self.done = 0
+        self.started = time.monotonic()
+        self.printed = self.started
+
+    def tick(self, n: int = 1):
+        self.done += n
+        now = time.monotonic()
+        if now - self.printed >= self.interval or (self.total and self.done >= self.total):
+            self.printed = now
+            print(self.line(now))
+
+    def line(self, now: float = None) -> str:
+        elapsed = max((now or time.monotonic()) - self.started, 1e-9)
+        rate = self.done / elapsed
+        pages = self.metrics.total("pages") / elapsed
+        line = f"[{self.done}/{self.total or '?'} {self.unit}] {rate * 60:.1f} {self.unit}/min, {pages:.1f} pages/s"
+        if self.total and rate > 0:
+            minutes, seconds = divmod(int((self.total - self.done) / rate), 60)
+            line += f", ETA {minutes // 60}:{minutes % 60:02}:{seconds:02}"
+        return line
@@ -0,0 +1,11 @@
+import re
+import unicodedata
+
+# Accents folded, lower-cased, punctuation dropped: "José Aldo Jr." -> "jose aldo jr"
+def normalize(name: str) -> str:
+    folded = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii")
+    return " ".join(re.sub(r"[^a-z0-9 ]", " ", folded.lower()).split())
+
+def ngrams(name: str, n: int = 3) -> set[str]:
+    padded = f"  {name} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
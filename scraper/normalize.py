@@ -0,0 +1,155 @@
+# Post-scrape normalization. The scrapers keep the site's text ("5' 11\"", "155 lbs.",
+# "Jul 23, 1986", "4:12", "KO/TKO"); this turns whole columns of it into numbers, dates
+# and a fixed set of methods in one pass, so re-normalizing the full history after a
+# rule change is a batch job over ufc.csv / fighters.csv instead of a re-scrape.
+#
+# normalize_fights() and normalize_fighters() return a copy of the frame with the typed
+# columns swapped in (height -> height_in, fight_time -> fight_time_s, ...) and a
+# parse_errors column naming every non-empty field that didn't parse.
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from scraper.profiles import DATE_FORMATS
+
+# Fixed method enum, in the order ufcstats lists them. ESPN spells a few differently
+# ("Decision (Unanimous)", "Submission (Rear-Naked Choke)"); METHOD_RULES folds both.
+METHODS = ["Decision - Unanimous", "Decision - Split", "Decision - Majority", "KO/TKO",
+           "TKO - Doctor's Stoppage", "Submission", "DQ", "Could Not Continue", "Overturned", "Other"]
+METHOD = pd.CategoricalDtype(METHODS)
+
+# First match wins, so the doctor's stoppage rule sits ahead of plain KO/TKO
+METHOD_RULES = [
+    (r"doctor", "TKO - Doctor's Stoppage"),
+    (r"\bko\b|\btko\b|knockout", "KO/TKO"),
+    (r"submission", "Submission"),
+    (r"decision.*unanimous", "Decision - Unanimous"),
+    (r"decision.*split", "Decision - Split"),
+    (r"decision.*majority", "Decision - Majority"),
+    (r"\bdq\b|disqualif", "DQ"),
+    (r"could not continue", "Could Not Continue"),
+    (r"overturned|no contest", "Overturned"),
+    (r"^other$", "Other"),
+]
+
+# Placeholders the sites use for a missing value; these are null, not parse errors
+MISSING = {"", "--", "n/a", "N/A", "None"}
+
+def blank(column: pd.Series) -> pd.Series:
+    return column.isna() | column.astype("string").str.strip().isin(MISSING)
+
+def inches(column: pd.Series) -> pd.Series:
+    text = column.astype("string")
+    feet = text.str.extract(r"(\d+)'\s*(\d+(?:\.\d+)?)?")
+    bare = text.str.extract(r"^\s*(\d+(?:\.\d+)?)\s*(?:\"|in\b|$)")[0]
+    total = pd.to_numeric(feet[0]) * 12 + pd.to_numeric(feet[1]).fillna(0)
+    return total.fillna(pd.to_numeric(bare)).round().astype("Int64")
+
+def pounds(column: pd.Series) -> pd.Series:
+    text = column.astype("string")
+    # "6' 0\", 185 lbs" (ESPN's HT/WT) as well as "185 lbs." and a bare 185
+    labelled = text.str.extract(r"(\d+(?:\.\d+)?)\s*lbs?")[0]
+    bare = text.str.extract(r"^\s*(\d+(?:\.\d+)?)\s*$")[0]
+    return pd.to_numeric(labelled.fillna(bare)).round().astype("Int64")
+
+def counts(column: pd.Series) -> pd.Series:
+    # "3" and "Round: 3" alike
+    return pd.to_numeric(column.astype("string").str.extract(r"(\d+)")[0]).astype("Int64")
+
+def seconds(column: pd.Series) -> pd.Series:
+    clock = column.astype("string").str.extract(r"(\d+):(\d{2})")
+    return (pd.to_numeric(clock[0]) * 60 + pd.to_numeric(clock[1])).astype("Int64")
+
+def dates(column: pd.Series) -> pd.Series:
+    # ESPN appends the age: "7/23/1986 (38)"
+    text = column.astype("string").str.replace(r"\s*\(.*\)\s*$", "", regex=True).str.strip()
+    parsed = pd.Series(pd.NaT, index=column.index, dtype="datetime64[ns]")
+    for date_format in DATE_FORMATS:
+        todo = parsed.isna() & text.notna()
+        if not todo.any():
+            break
+        parsed[todo] = pd.to_datetime(text[todo], format=date_format, errors="coerce")
+    return parsed
+
+def methods(column: pd.Series) -> pd.Series:
+    text = column.astype("string").str.strip().str.lower().fillna("")
+    matches = [text.str.contains(pattern, regex=True).to_numpy(dtype=bool) for pattern, _ in METHOD_RULES]
+    labels = np.select(matches, [name for _, name in METHOD_RULES], default="")
+    return pd.Series(labels, index=column.index).replace("", None).astype(METHOD)
+
+# raw column -> (typed column, parser)
+FIGHT_FIELDS = {
+    "date": ("date", dates),
+    "rounds": ("rounds", counts),
+    "fight_time": ("fight_time_s", seconds),
+    "method": ("method", methods),
+}
+FIGHTER_FIELDS = {
+    "wins": ("wins", counts),
+    "losses": ("losses", counts),
+    "draws": ("draws", counts),
+    "height": ("height_in", inches),
+    "weight": ("weight_lbs", pounds),
+    "reach": ("reach_in", inches),
+    "birth_date": ("birth_date", dates),
+    "birthdate": ("birth_date", dates),  # scraped rows: ESPN's BIRTHDATE label
+    "last_fight_date": ("last_fight_date", dates),
+}
+
+def prefixed(fields: dict, *prefixes: str) -> dict:
+    return {prefix + raw: (prefix + typed, parser)
+            for prefix in prefixes for raw, (typed, parser) in fields.items()}
+
+def normalize(frame: pd.DataFrame, fields: dict) -> pd.DataFrame:
+    out = frame.copy()
+    failed = {}
+    for column, (typed, parser) in fields.items():
+        if column not in frame:
+            continue
+        # Scraped columns repeat a few hundred distinct strings ("5' 11\"", "155 lbs."),
+        # so each distinct value is parsed once and broadcast back by its code
+        codes, uniques = pd.factorize(frame[column], use_na_sentinel=False)
+        values = parser(pd.Series(uniques, dtype=object)).take(codes).set_axis(frame.index)
+        failed[column] = values.isna() & ~blank(frame[column])
+        out = out.drop(columns=column)
+        out[typed] = values
+    failed = pd.DataFrame(failed, index=frame.index)
+    # Comma-joined names of the failed columns, per row
+    out["parse_errors"] = failed.dot(failed.columns + ",").str.rstrip(",") if len(failed.columns) else ""
+    return out
+
+# ufc.csv / the ufc table. Also types the per-fighter bio columns the ufc table
+# carries (fighter0_height, ...); its own "weight" is the weight class and stays text.
+def normalize_fights(frame: pd.DataFrame) -> pd.DataFrame:
+    out = normalize(frame, {**FIGHT_FIELDS, **prefixed(FIGHTER_FIELDS, "fighter0_", "fighter1_")})
+    for column in ("title", "wasDraw"):
+        if column in out:
+            out[column] = out[column].map({True: True, False: False, 1: True, 0: False,
+                                           "True": True, "False": False, "1": True, "0": False})
+            out[column] = out[column].astype("boolean")
+    return out
+
+# fighters.csv / the fighters table
+def normalize_fighters(frame: pd.DataFrame) -> pd.DataFrame:
+    return normalize(frame, FIGHTER_FIELDS)
+
+def error_counts(frame: pd.DataFrame) -> pd.Series:
+    return frame["parse_errors"].str.split(",").explode().loc[lambda errors: errors != ""].value_counts()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalize scraped CSVs into typed columns")
+    parser.add_argument("--fights", default="ufc.csv")
+    parser.add_argument("--fighters", default="fighters.csv")
+    parser.add_argument("--suffix", default=".normalized",
+                        help="written next to each input, e.g. ufc.normalized.csv")
+    args = parser.parse_args()
+
+    for path, normalizer in ((args.fights, normalize_fights), (args.fighters, normalize_fighters)):
+        frame = normalizer(pd.read_csv(path, dtype="string", keep_default_na=False))
+        out = path.rsplit(".", 1)[0] + args.suffix + ".csv"
+        frame.to_csv(out, index=False)
+        errors = error_counts(frame)
+        print(f"{out}: {len(frame)} rows, {(frame['parse_errors'] != '').sum()} with parse errors")
+        for column, count in errors.items():
+            print(f"  {column}: {count}")
@@ -0,0 +1,26 @@
+# HTML parsers: each takes the raw page source (from requests, driver.page_source
+# or a saved file) and returns records from scraper.records. Page types are looked
+# up by name so callers and tools can swap in their own parser for a page.
+from scraper.parsers import bing, espn, ufcstats
+
+PARSERS = {
+    "ufcstats.events": ufcstats.parse_event_links,
+    "ufcstats.event": ufcstats.parse_event,
+    "ufcstats.fight": ufcstats.parse_fight,
+    "espn.years": espn.parse_years,
+    "espn.schedule": espn.parse_schedule,
+    "espn.event": espn.parse_event,
+    "espn.bout": espn.parse_bout,
+    "espn.competitors": espn.parse_competitors,
+    "espn.profile": espn.parse_profile,
+    "espn.record": espn.parse_record,
+    "espn.fighter": espn.parse_fighter,
+    "bing.results": bing.parse_first_result,
+}
+
+def parse(page_type: str, page: str, *args, **kwargs):
+    return PARSERS[page_type](page, *args, **kwargs)
+
+def parse_file(page_type: str, path: str, *args, **kwargs):
+    with open(path, "r", encoding="utf-8") as f:
+        return parse(page_type, f.read(), *args, **kwargs)
@@ -0,0 +1,5 @@
+from scraper.parsers.html import by_class, document
+
+# First organic result on a Bing results page
+def parse_first_result(page: str, url: str = None) -> str:
+    return by_class(document(page, url), "b_algo")[0].findall(".//a")[0].get("href")
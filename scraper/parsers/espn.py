@@ -0,0 +1,119 @@
+from scraper.parsers.html import by_class, document, text
+from scraper.records import Bout, Event, Fighter
+
+def parse_years(page: str, url: str = None) -> list[str]:
+    event_dropdown = by_class(document(page, url), "mr3")[0]
+    return [text(option) for option in by_class(event_dropdown, "dropdown__option")]
+
+# Event links on a schedule page. For the current year only the "Past Results"
+# table is used, since upcoming events have no results yet.
+def parse_schedule(page: str, url: str = None, past_only: bool = False) -> list[str]:
+    root = document(page, url)
+    if past_only:
+        for table in by_class(root, "ResponsiveTable"):
+            if text(by_class(table, "Table__Title")[0]) == "Past Results":
+                root = table
+                break
+        else:
+            return []
+    return [by_class(e, "AnchorLink")[0].get("href") for e in by_class(root, "event__col")]
+
+def parse_event(page: str, url: str = None) -> Event:
+    root = document(page, url)
+    return Event(
+        name=text(by_class(root, "headline")[0]),
+        date=text(by_class(root, "n6")[0]),
+        location=text(by_class(root, "n8")[0]),
+    )
+
+def count_bouts(page: str, url: str = None) -> int:
+    return len(by_class(document(page, url), "mb6"))
+
+# The i-th bout on the card. Raises ValueError if its result hasn't rendered yet.
+def parse_bout(page: str, i: int, url: str = None) -> Bout:
+    fight = by_class(document(page, url), "mb6")[i]
+    fighter_0, fighter_1 = by_class(fight, "MMACompetitor")[:2]
+
+    if by_class(fighter_0, "MMACompetitor__arrow"):
+        winner = 'fighter_0'
+    elif by_class(fighter_1, "MMACompetitor__arrow"):
+        winner = 'fighter_1'
+    else:
+        winner = 'draw'
+
+    end_results = by_class(fight, "Gamestrip__Time--wrapper")[0]
+    method = text(by_class(end_results, "h8")[1])
+    num_rounds, end_time = text(by_class(end_results, "n9")[0]).split(",")
+
+    description = text(by_class(fight, "MMAFightCard__GameNote")[0])
+
+    return Bout(
+        winner=winner,
+        method=method,
+        rounds=num_rounds.strip(),
+        fight_time=end_time.strip(),
+        title="Title" in description,
+        gender="Female" if "Women" in description else "Male",
+        fighter_links=[link.get("href") for link in by_class(fight, "MMAFightCenter__ProfileLink")],
+    )
+
+# (name, profile link) for every competitor on an event page, for the fighter roster
+def parse_competitors(page: str, url: str = None) -> list[tuple[str, str]]:
+    competitors = []
+    for competitor in by_class(document(page, url), "MMACompetitor"):
+        links = by_class(competitor, "MMAFightCenter__ProfileLink")
+        if not links:
+            continue
+        headings = competitor.findall(".//h2")
+        name = text(headings[0]) if headings else text(links[0])
+        if name:
+            competitors.append((name, links[0].get("href")))
+    return competitors
+
+# Link to the Bio tab from a fighter's overview page
+def parse_profile(page: str, url: str = None) -> str:
+    return by_class(document(page, url), "Nav__Secondary__Menu__Link")[3].get("href")
+
+# W-L-D record from a fighter's overview or bio page
+def parse_record(page: str, url: str = None) -> tuple[str, str, str]:
+    wins, losses, draws = text(by_class(document(page, url), "StatBlockInner__Value")[0]).split("-")
+    return wins, losses, draws
+
+# Fighter bio page. Raises ValueError if the W-L-D record hasn't rendered yet.
+def parse_fighter(page: str, url: str = None) -> Fighter:
+    root = document(page, url)
+
+    # Name
+    name = by_class(root, "PlayerHeader__Name")[0].findall(".//span")
+    first_name = text(name[0]).capitalize()
+    last_name = text(name[1]).capitalize() if len(name) > 1 else ""
+
+    # Record
+    wins, losses, draws = text(by_class(root, "StatBlockInner__Value")[0]).split("-")
+
+    # Image
+    image = "n/a"
+    image_divs = by_class(root, "PlayerHeader__Image")
+    wrappers = by_class(image_divs[0], "Image__Wrapper") if image_divs else []
+    if len(wrappers) > 1 and wrappers[1].findall(".//img"):
+        image = wrappers[1].findall(".//img")[0].get("src")
+
+    # Stats
+    bio_stats = {}
+    for stat in by_class(root, "Bio__Item"):
+        label = text(by_class(stat, "Bio__Label")[0])
+        value = text(by_class(stat, "mr3")[0])
+        if (label == "HT/WT"):
+            label = "height"
+            value, _, weight = value.partition(",")
+            bio_stats["weight"] = weight.strip()
+        elif (label == "WT CLASS"):
+            label = "weightclass"
+            if ("Women" in value):
+                value = value.split(" ")[1]
+        elif (label == "BIRTHDATE"):
+            value = value.split(" ")[0]
+        label = label.replace(" ", "_").lower()
+        bio_stats[label] = value
+
+    return Fighter(first_name, last_name, wins, losses, draws, image, bio_stats)
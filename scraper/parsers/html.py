@@ -0,0 +1,18 @@
+from lxml import html as lxml_html
+
+# Parses a page once. Links are made absolute (like WebElement.get_attribute does)
+# when the page URL is known.
+def document(page: str, url: str = None):
+    root = lxml_html.fromstring(page, base_url=url)
+    if url:
+        root.make_links_absolute(url)
+    return root
+
+# Same matching rule as Selenium's By.CLASS_NAME (one token of the class attribute)
+def by_class(element, class_name: str) -> list:
+    return element.xpath(
+        f".//*[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]")
+
+# Rendered text with whitespace collapsed, which is what WebElement.text returns
+def text(element) -> str:
+    return " ".join(element.text_content().split())
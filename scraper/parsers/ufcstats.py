@@ -0,0 +1,88 @@
+from scraper.parsers.html import by_class, document, text
+from scraper.records import Event, Fight
+
+# Longest first, so "LIGHT HEAVYWEIGHT" wins over "HEAVYWEIGHT"
+WEIGHT_CLASSES = ["Light Heavyweight", "Super Heavyweight", "Strawweight", "Flyweight",
+                  "Bantamweight", "Featherweight", "Lightweight", "Welterweight", "Middleweight",
+                  "Heavyweight", "Catch Weight", "Open Weight"]
+
+def weight_class(bout: str) -> str:
+    for name in WEIGHT_CLASSES:
+        if name.upper() in bout:
+            return name
+    return ""
+
+def parse_event_links(page: str, url: str = None, last_scraped_event: str = None) -> list[str]:
+    event_links = []
+    for event in by_class(document(page), "b-link_style_black"):
+        link = event.get("href")
+        if last_scraped_event and link == last_scraped_event:
+            break
+        event_links.append(link)
+    return event_links
+
+def parse_event(page: str, url: str = None) -> Event:
+    root = document(page, url)
+    fight_links = [fight.get("href") for fight in by_class(root, "b-flag") if fight.get("href")]
+
+    # Date and Location (they use the same class name)
+    date_and_location = by_class(root, "b-list__box-list-item")
+    date = text(date_and_location[0]).split(" ", 1)[1].strip()
+    location = text(date_and_location[1]).split(" ", 1)[1].strip()
+
+    names = by_class(root, "b-content__title-highlight")
+    return Event(text(names[0]) if names else "", date, location, fight_links)
+
+def parse_fight(page: str, url: str = None) -> Fight:
+    root = document(page, url)
+
+    # Winner
+    result = text(by_class(root, "b-fight-details__person-status")[0])
+    if (result == 'D'):
+        winner = 'draw'
+    elif (result == 'W'):
+        winner = 'fighter_0'
+    else:
+        winner = 'fighter_1'
+
+    # Event Name
+    event = text(by_class(root, "b-link")[0])
+
+    # Method
+    method_wrapper = by_class(root, "b-fight-details__text-item_first")[0]
+    method = text(method_wrapper.findall(".//i")[1])
+
+    # Rounds, End Time, Referee (all share one class name)
+    fight_details = by_class(root, "b-fight-details__text-item")
+    num_rounds = text(fight_details[0]).split(" ")[1]
+    end_time = text(fight_details[1]).split(" ")[1].strip()
+    referee = text(fight_details[3].findall(".//span")[0])
+
+    # Gender + Title (the site upper-cases this with CSS, which WebElement.text applied)
+    bout = text(by_class(root, "b-fight-details__fight-title")[0]).upper()
+    bout = bout.replace("BOUT", "").replace("UFC", "").strip()
+
+    # Nicknames
+    def extract_nickname(div):
+        titles = by_class(div, "b-fight-details__person-title")
+        return text(titles[0]).strip('"') if titles else ""
+
+    name_divs = by_class(root, "b-fight-details__person-text")
+    person_links = by_class(root, "b-fight-details__person-link")
+    fighters = [text(fighter) for fighter in person_links]
+
+    return Fight(
+        fighters=fighters[:2],
+        nicknames=[extract_nickname(name_divs[0]), extract_nickname(name_divs[1])],
+        winner=winner,
+        event=event,
+        method=method,
+        rounds=num_rounds,
+        fight_time=end_time,
+        referee=referee,
+        bout=bout,
+        title="TITLE" in bout,
+        gender="Female" if "WOMEN" in bout else "Male",
+        weight_class=weight_class(bout),
+        fighter_links=[fighter.get("href") for fighter in person_links[:2]],
+    )
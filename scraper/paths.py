@@ -0,0 +1,144 @@
+# Precomputed shortest-path index for Connect. The graph has a few thousand fighters,
+# so a BFS from every fighter fits in an N x N uint8 matrix (a few MB) that is
+# memory-mapped at load. Distance queries are then a single lookup, and a path or an
+# "is this guess still on a shortest path" check only touches the fighters on it.
+import argparse
+import os
+import random
+import sqlite3
+from collections import deque
+
+import numpy as np
+
+from scraper.graph import GRAPH_DIR, load_csr
+from scraper.ingest import UFC_DB
+
+UNREACHABLE = 255
+
+# Level-synchronous BFS over the CSR arrays, one whole frontier per numpy step
+def bfs_distances(offsets: np.ndarray, neighbors: np.ndarray, source: int) -> np.ndarray:
+    dist = np.full(len(offsets) - 1, UNREACHABLE, dtype=np.uint8)
+    dist[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    depth = 0
+    while frontier.size:
+        depth += 1
+        starts = offsets[frontier].astype(np.int64)
+        counts = offsets[frontier + 1] - starts
+        # Positions starts[j] .. starts[j] + counts[j] - 1 for every frontier node j
+        positions = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+        reached = neighbors[positions]
+        frontier = np.unique(reached[dist[reached] == UNREACHABLE])
+        dist[frontier] = min(depth, UNREACHABLE - 1)
+    return dist
+
+def build_index(offsets: np.ndarray, neighbors: np.ndarray, out_dir: str = GRAPH_DIR) -> np.ndarray:
+    num_fighters = len(offsets) - 1
+    path = os.path.join(out_dir, "distances.npy")
+    distances = np.lib.format.open_memmap(path + ".tmp", mode="w+", dtype=np.uint8,
+                                          shape=(num_fighters, num_fighters))
+    for source in range(num_fighters):
+        distances[source] = bfs_distances(offsets, neighbors, source)
+    distances.flush()
+    del distances
+    os.replace(path + ".tmp", path)
+    return np.load(path, mmap_mode="r")
+
+class PathIndex:
+    def __init__(self, out_dir: str = GRAPH_DIR):
+        self.offsets, self.neighbors = load_csr(out_dir)
+        self.distances = np.load(os.path.join(out_dir, "distances.npy"), mmap_mode="r")
+
+    def opponents(self, fighter_id: int) -> np.ndarray:
+        return self.neighbors[self.offsets[fighter_id]:self.offsets[fighter_id + 1]]
+
+    # None if the two fighters aren't connected
+    def distance(self, a: int, b: int) -> int | None:
+        d = int(self.distances[a, b])
+        return None if d == UNREACHABLE else d
+
+    # True if going a -> via -> b is still as short as the best a -> b route
+    def on_shortest_path(self, a: int, via: int, b: int) -> bool:
+        total = self.distance(a, b)
+        return (total is not None and self.distance(a, via) is not None
+                and int(self.distances[a, via]) + int(self.distances[via, b]) == total)
+
+    # Opponents of a that are one step closer to b
+    def next_hops(self, a: int, b: int) -> np.ndarray:
+        d = self.distance(a, b)
+        if not d:
+            return np.empty(0, dtype=np.int32)
+        hops = self.opponents(a)
+        return hops[self.distances[hops, b] == d - 1]
+
+    # One shortest path as a list of fighter IDs (lowest ID at each step), or None
+    def path(self, a: int, b: int) -> list[int] | None:
+        if self.distance(a, b) is None:
+            return None
+        path = [a]
+        while path[-1] != b:
+            path.append(int(self.next_hops(path[-1], b).min()))
+        return path
+
+# Plain queue-based BFS, used as the reference when validating the index
+def reference_bfs(offsets: np.ndarray, neighbors: np.ndarray, source: int) -> dict[int, int]:
+    dist = {source: 0}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for neighbor in neighbors[offsets[node]:offsets[node + 1]]:
+            neighbor = int(neighbor)
+            if neighbor not in dist:
+                dist[neighbor] = dist[node] + 1
+                queue.append(neighbor)
+    return dist
+
+# Checks sampled rows of the index against reference BFS, plus every sampled path
+def validate(index: PathIndex, samples: int = 100, seed: int = 0) -> list[str]:
+    errors = []
+    num_fighters = len(index.offsets) - 1
+    sources = random.Random(seed).sample(range(num_fighters), min(samples, num_fighters))
+    for source in sources:
+        expected = reference_bfs(index.offsets, index.neighbors, source)
+        for target in range(num_fighters):
+            got = index.distance(source, target)
+            if got != expected.get(target):
+                errors.append(f"distance({source}, {target}) = {got}, BFS says {expected.get(target)}")
+        for target in list(expected)[:20]:
+            path = index.path(source, target)
+            valid = (len(path) - 1 == expected[target]
+                     and all(b in index.opponents(a) for a, b in zip(path, path[1:])))
+            if not valid:
+                errors.append(f"path({source}, {target}) = {path} is not a shortest path")
+    return errors
+
+def fighter_id(conn: sqlite3.Connection, name: str) -> int:
+    first_name, last_name = name.split(" ", 1) if " " in name else (name, "")
+    row = conn.execute("SELECT id FROM fighter_ids WHERE first_name = ? AND last_name = ?",
+                       (first_name, last_name)).fetchone()
+    if row is None:
+        raise SystemExit(f"Unknown fighter: {name}")
+    return row[0]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build, query or validate the shortest-path index")
+    parser.add_argument("command", choices=["build", "validate", "path"])
+    parser.add_argument("names", nargs="*", help="start and end fighter for 'path'")
+    parser.add_argument("--graph-dir", default=GRAPH_DIR)
+    parser.add_argument("--ufc-db", default=UFC_DB)
+    parser.add_argument("--samples", type=int, default=100)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        distances = build_index(*load_csr(args.graph_dir), args.graph_dir)
+        print(f"Wrote {distances.shape[0]}x{distances.shape[1]} distance matrix to {args.graph_dir}")
+    elif args.command == "validate":
+        errors = validate(PathIndex(args.graph_dir), args.samples)
+        print("\n".join(errors[:20]) or "Index matches BFS")
+        raise SystemExit(1 if errors else 0)
+    else:
+        conn = sqlite3.connect(args.ufc_db)
+        index = PathIndex(args.graph_dir)
+        path = index.path(*(fighter_id(conn, name) for name in args.names[:2]))
+        names = {i: f"{first} {last}".strip() for i, first, last in conn.execute("SELECT * FROM fighter_ids")}
+        print(" -> ".join(names[i] for i in path) if path else "No path found")
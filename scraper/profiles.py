@@ -0,0 +1,167 @@
+# Durable fighter-profile store (SQLite). Bios are scraped once and kept across runs;
+# only the W-L-D record of fighters who fought since their last refresh is updated.
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+DAY = 24 * 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    fighter_id TEXT PRIMARY KEY,
+    profile_url TEXT,
+    data TEXT NOT NULL,
+    refreshed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_profiles_url ON profiles(profile_url);
+CREATE TABLE IF NOT EXISTS roster (
+    profile_url TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    nickname TEXT
+);
+"""
+
+DATE_FORMATS = ["%B %d, %Y", "%b %d, %Y", "%A, %B %d, %Y", "%a, %b %d, %Y", "%m/%d/%Y", "%Y-%m-%d"]
+
+# Dates as printed by ufcstats ("February 22, 2025") or ESPN ("6/23/1999"); None if unknown
+def parse_event_date(date: str) -> datetime | None:
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(date.strip(), date_format)
+        except (AttributeError, ValueError):
+            continue
+    return None
+
+class ProfileStore:
+    def __init__(self, path: str = "profiles.db"):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.run_started = time.time()
+
+    def get(self, fighter_id: str) -> dict | None:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT data FROM profiles WHERE fighter_id = ?", (fighter_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def refreshed_at(self, fighter_id: str) -> float | None:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT refreshed_at FROM profiles WHERE fighter_id = ?", (fighter_id,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, fighter_id: str, data: dict, profile_url: str = None):
+        with self.lock, self.conn:
+            self.conn.execute(
+                """INSERT INTO profiles (fighter_id, profile_url, data, refreshed_at)
+                   VALUES (?, ?, ?, ?)
+                   ON CONFLICT(fighter_id) DO UPDATE SET
+                     profile_url = COALESCE(excluded.profile_url, profile_url),
+                     data = excluded.data,
+                     refreshed_at = excluded.refreshed_at""",
+                (fighter_id, profile_url, json.dumps(data), time.time()))
+
+    def profile_url(self, fighter_id: str) -> str | None:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT profile_url FROM profiles WHERE fighter_id = ?", (fighter_id,)).fetchone()
+        return row[0] if row else None
+
+    # A stored record is stale if the fighter has fought since it was refreshed.
+    # Without a usable event date, refresh at most once per run.
+    def is_stale(self, fighter_id: str, event_date: str = None) -> bool:
+        refreshed_at = self.refreshed_at(fighter_id)
+        if refreshed_at is None:
+            return True
+        fought_at = parse_event_date(event_date) if event_date else None
+        if fought_at is None:
+            return refreshed_at < self.run_started
+        return refreshed_at < fought_at.timestamp() + DAY
+
+    # ESPN fighter roster used by scraper.identity: (profile_url, name, nickname)
+    def add_roster(self, entries: list[tuple[str, str, str]]):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                """INSERT INTO roster (profile_url, name, nickname) VALUES (?, ?, ?)
+                   ON CONFLICT(profile_url) DO UPDATE SET
+                     name = excluded.name,
+                     nickname = COALESCE(excluded.nickname, nickname)""",
+                entries)
+
+    # Roster plus every stored profile that already has an ESPN link
+    def roster(self) -> list[tuple[str, str, str]]:
+        with self.lock:
+            entries = self.conn.execute("SELECT profile_url, name, nickname FROM roster").fetchall()
+            profiles = self.conn.execute(
+                "SELECT profile_url, data FROM profiles WHERE profile_url LIKE '%espn.com%'").fetchall()
+        known = {url for url, _, _ in entries}
+        for url, data in profiles:
+            if url not in known:
+                fighter = json.loads(data)
+                name = f"{fighter.get('first_name', '')} {fighter.get('last_name', '')}".strip()
+                entries.append((url, name, fighter.get("nickname")))
+        return entries
+
+    def close(self):
+        self.conn.close()
+
+# Fighters already resolved (or being resolved) by any worker this run. The first
+# worker to meet an ID loads it; the others wait for that result. With a store, a
+# known fighter costs nothing, or one record refresh if they have fought since.
+class FighterRegistry:
+    def __init__(self, store: ProfileStore = None):
+        self.store = store
+        self.fighters = {}
+        self.pending = {}
+        self.unwritten = []
+        self.lock = threading.Lock()
+
+    # scrape() -> (row, profile_url) does the full lookup;
+    # refresh(profile_url, stored_row) -> row only updates the W-L-D record
+    def get_or_scrape(self, fighter_id: str, scrape, refresh=None, event_date: str = None) -> dict:
+        while True:
+            with self.lock:
+                if fighter_id in self.fighters:
+                    return self.fighters[fighter_id]
+                done = self.pending.get(fighter_id)
+                if done is None:
+                    done = self.pending[fighter_id] = threading.Event()
+                    break
+            # Another worker owns this fighter; if it fails we try to claim it ourselves
+            done.wait()
+
+        try:
+            fighter = self.load(fighter_id, scrape, refresh, event_date)
+            with self.lock:
+                self.fighters[fighter_id] = fighter
+                self.unwritten.append(fighter)
+            return fighter
+        finally:
+            with self.lock:
+                del self.pending[fighter_id]
+            done.set()
+
+    # Fighters resolved since the last call, for sinks that write as they go
+    def drain(self) -> list[dict]:
+        with self.lock:
+            fighters, self.unwritten = self.unwritten, []
+        return fighters
+
+    def load(self, fighter_id: str, scrape, refresh, event_date: str) -> dict:
+        if self.store is None:
+            return scrape()[0]
+
+        stored = self.store.get(fighter_id)
+        if stored is not None and not self.store.is_stale(fighter_id, event_date):
+            return stored
+
+        profile_url = self.store.profile_url(fighter_id) if stored is not None else None
+        if stored is not None and refresh and profile_url:
+            fighter = refresh(profile_url, stored)
+        else:
+            fighter, profile_url = scrape()
+        self.store.put(fighter_id, fighter, profile_url)
+        return fighter
@@ -0,0 +1,50 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+# Requests per second and burst size for each site we scrape
+HOST_RATES = {
+    "ufcstats.com": (8.0, 16),
+    "espn.com": (4.0, 8),
+    "bing.com": (1.0, 2),
+}
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    # Blocks the calling thread until a token is available
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def host_key(url: str) -> str:
+    host = urlparse(url).hostname or ""
+    for key in HOST_RATES:
+        if host == key or host.endswith("." + key):
+            return key
+    return host
+
+# One bucket per host, so a slow site never holds back requests to the others.
+# rates={} turns limiting off (the benchmark's local fixture site).
+class HostRateLimiter:
+    def __init__(self, rates: dict = None):
+        self.rates = HOST_RATES if rates is None else rates
+        self.buckets = {key: TokenBucket(*rate) for key, rate in self.rates.items()}
+
+    def acquire(self, url: str):
+        bucket = self.buckets.get(host_key(url))
+        if bucket:
+            bucket.acquire()
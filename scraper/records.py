@@ -0,0 +1,64 @@
+# Typed records produced by the parsers in scraper/parsers
+from dataclasses import dataclass, field
+
+# Weight classes the games draw fighters from, as the fighters table spells them;
+# the same list shared/db.ts filters on
+ALLOWED_WEIGHTS = ("115 lbs.", "125 lbs.", "135 lbs.", "145 lbs.", "155 lbs.", "170 lbs.", "185 lbs.", "205 lbs.")
+
+@dataclass
+class Event:
+    name: str
+    date: str
+    location: str
+    fight_links: list[str] = field(default_factory=list)
+
+@dataclass
+class Fight:
+    fighters: list[str]
+    nicknames: list[str]
+    winner: str
+    event: str
+    method: str
+    rounds: str
+    fight_time: str
+    referee: str
+    bout: str
+    title: bool
+    gender: str
+    weight_class: str = ""
+    fighter_links: list[str] = field(default_factory=list)
+
+# One bout on an ESPN fight card (fighters are profile links, not names)
+@dataclass
+class Bout:
+    winner: str
+    method: str
+    rounds: str
+    fight_time: str
+    title: bool
+    gender: str
+    fighter_links: list[str]
+
+@dataclass
+class Fighter:
+    first_name: str
+    last_name: str
+    wins: str
+    losses: str
+    draws: str
+    image: str
+    bio_stats: dict = field(default_factory=dict)
+
+    # Row in the same shape the drafts keep in fighters_dict
+    def as_row(self, gender: str, **extra) -> dict:
+        return {
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            **extra,
+            "gender": gender,
+            "wins": self.wins,
+            "losses": self.losses,
+            "draws": self.draws,
+            "image": self.image,
+            **self.bio_stats
+        }
@@ -0,0 +1,211 @@
+# Release build: merges shared/ufcSQL.db and shared/fighters.db into one read-only
+# database with typed columns and integer keys, so the server opens one file and joins
+# fights to fighters by ID instead of splitting names on spaces.
+#
+#   fighters(id, names, record, height_in, weight_lbs, reach_in, stance, birth_date, ...)
+#   events(id, name, date, location)
+#   fights(id, fight_key, event_id, fighter0_id, fighter1_id, winner_id, ..., fight_time_s)
+#   edges(fighter_id, opponent_id, fight_id)               WITHOUT ROWID
+#   daily_schedule(date, fighter_id)                       WITHOUT ROWID, if generated
+#   connect_pairs(id, start_id, end_id, distance, difficulty), if generated
+#
+# Dates are ISO 8601, heights and reaches inches, weights pounds, fight times seconds.
+# The file is written next to the target, ANALYZEd, VACUUMed and then renamed over it.
+import argparse
+import os
+import sqlite3
+
+import pandas as pd
+
+from scraper.ingest import FIGHTERS_DB, UFC_DB, fight_fingerprint, full_name
+from scraper.normalize import normalize_fighters, normalize_fights
+from scraper.records import ALLOWED_WEIGHTS
+
+RELEASE_DB = os.path.join("shared", "fightfacts.db")
+
+FIGHTER_COLUMNS = ["first_name", "last_name", "nickname", "wins", "losses", "draws", "total_fights",
+                   "height_in", "weight_lbs", "reach_in", "stance", "birth_date", "last_fight_date"]
+# ALLOWED_WEIGHTS ("135 lbs.", ...) as pounds
+ALLOWED_POUNDS = [int(weight.split()[0]) for weight in ALLOWED_WEIGHTS]
+
+SCHEMA = """
+CREATE TABLE fighters (
+    id INTEGER PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    nickname TEXT,
+    wins INTEGER,
+    losses INTEGER,
+    draws INTEGER,
+    total_fights INTEGER,
+    height_in INTEGER,
+    weight_lbs INTEGER,
+    reach_in INTEGER,
+    stance TEXT,
+    birth_date TEXT,
+    last_fight_date TEXT,
+    eligible INTEGER NOT NULL,
+    UNIQUE (first_name, last_name)
+);
+CREATE TABLE events (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    date TEXT,
+    location TEXT,
+    UNIQUE (name, date)
+);
+CREATE TABLE fights (
+    id INTEGER PRIMARY KEY,
+    fight_key TEXT NOT NULL UNIQUE,
+    event_id INTEGER NOT NULL REFERENCES events(id),
+    fighter0_id INTEGER NOT NULL REFERENCES fighters(id),
+    fighter1_id INTEGER NOT NULL REFERENCES fighters(id),
+    winner_id INTEGER REFERENCES fighters(id),
+    gender TEXT,
+    weight_class TEXT,
+    title INTEGER,
+    was_draw INTEGER,
+    method TEXT,
+    rounds INTEGER,
+    fight_time_s INTEGER
+);
+CREATE TABLE edges (
+    fighter_id INTEGER NOT NULL,
+    opponent_id INTEGER NOT NULL,
+    fight_id INTEGER NOT NULL,
+    PRIMARY KEY (fighter_id, opponent_id, fight_id)
+) WITHOUT ROWID;
+CREATE TABLE daily_schedule (
+    date TEXT PRIMARY KEY,
+    fighter_id INTEGER NOT NULL REFERENCES fighters(id)
+) WITHOUT ROWID;
+CREATE TABLE connect_pairs (
+    id INTEGER PRIMARY KEY,
+    start_id INTEGER NOT NULL REFERENCES fighters(id),
+    end_id INTEGER NOT NULL REFERENCES fighters(id),
+    distance INTEGER NOT NULL,
+    difficulty TEXT NOT NULL
+);
+"""
+
+INDEXES = """
+CREATE INDEX idx_fighters_last_name ON fighters(last_name);
+CREATE INDEX idx_fighters_eligible ON fighters(eligible, first_name, last_name);
+CREATE INDEX idx_events_date ON events(date);
+CREATE INDEX idx_fights_event ON fights(event_id);
+CREATE INDEX idx_fights_fighter0 ON fights(fighter0_id, fighter1_id);
+CREATE INDEX idx_fights_fighter1 ON fights(fighter1_id, fighter0_id);
+CREATE INDEX idx_connect_pairs_difficulty ON connect_pairs(difficulty, id);
+"""
+
+# Frame -> rows of plain Python values (NaN/NA/NaT -> None, dates -> ISO strings)
+def records(frame: pd.DataFrame) -> list[tuple]:
+    frame = frame.copy()
+    for column in frame.select_dtypes("datetime").columns:
+        frame[column] = frame[column].dt.strftime("%Y-%m-%d")
+    return list(frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None))
+
+def table_exists(conn: sqlite3.Connection, schema: str, table: str) -> bool:
+    return conn.execute(f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?",
+                        (table,)).fetchone() is not None
+
+def build_release(ufc_db: str = UFC_DB, fighters_db: str = FIGHTERS_DB, out: str = RELEASE_DB) -> dict:
+    tmp = out + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp)
+    conn.execute("ATTACH DATABASE ? AS u", (ufc_db,))
+    conn.execute("ATTACH DATABASE ? AS f", (fighters_db,))
+    conn.executescript(SCHEMA)
+
+    fights = normalize_fights(pd.read_sql("SELECT * FROM u.ufc", conn))
+    for i in (0, 1):
+        fights[f"fighter{i}_last_name"] = fights[f"fighter{i}_last_name"].fillna("")
+    stored = normalize_fighters(pd.read_sql("SELECT * FROM f.fighters", conn))
+    stored["last_name"] = stored["last_name"].fillna("")
+
+    # Fighters: every fighters.db row, plus anyone who only appears in the ufc table
+    # (their stats come from their latest fight row)
+    appearances = pd.concat([
+        fights[[f"fighter{i}_{column}" for column in FIGHTER_COLUMNS if f"fighter{i}_{column}" in fights]]
+        .rename(columns=lambda column: column.split("_", 1)[1]) for i in (0, 1)])
+    fighters = (pd.concat([stored, appearances])
+                .drop_duplicates(["first_name", "last_name"])
+                .sort_values(["first_name", "last_name"], ignore_index=True)
+                .reindex(columns=FIGHTER_COLUMNS))
+    fighters["eligible"] = fighters["weight_lbs"].isin(ALLOWED_POUNDS).astype(int)
+    fighters.insert(0, "id", range(1, len(fighters) + 1))
+    fighter_ids = {key: i for key, i in zip(zip(fighters["first_name"], fighters["last_name"]), fighters["id"])}
+
+    events = (fights[["event", "date", "location"]].drop_duplicates(["event", "date"])
+              .sort_values(["date", "event"], ignore_index=True))
+    events.insert(0, "id", range(1, len(events) + 1))
+    fights = fights.merge(events[["id", "event", "date"]].rename(columns={"id": "event_id"}),
+                          on=["event", "date"], how="left")
+
+    for i in (0, 1):
+        fights[f"fighter{i}_id"] = [fighter_ids[key] for key in
+                                    zip(fights[f"fighter{i}_first_name"], fights[f"fighter{i}_last_name"])]
+    if "fight_id" not in fights:
+        fights["fight_id"] = [
+            fight_fingerprint(date, full_name(first_0, last_0), full_name(first_1, last_1))
+            for date, first_0, last_0, first_1, last_1 in zip(
+                fights["date"].dt.strftime("%B %d, %Y").fillna(""),
+                fights["fighter0_first_name"], fights["fighter0_last_name"],
+                fights["fighter1_first_name"], fights["fighter1_last_name"])]
+    was_draw = fights["wasDraw"].fillna(False) if "wasDraw" in fights else pd.Series(False, index=fights.index)
+    # Only a recorded result names a winner. Rows from before the winner column are in
+    # card order, not winner order, so their winner_id stays NULL.
+    winner = fights["winner"] if "winner" in fights else pd.Series(None, index=fights.index, dtype=object)
+    was_draw |= winner == "draw"
+    fights["winner_id"] = (fights["fighter0_id"].where(winner == "fighter_0")
+                           .fillna(fights["fighter1_id"].where(winner == "fighter_1")))
+    fights["winner_id"] = fights["winner_id"].where(~was_draw & fights["method"].ne("Overturned")).astype("Int64")
+    fights["was_draw"] = was_draw.astype(int)
+    fights["title"] = fights["title"].fillna(False).astype(int)
+    fights.insert(0, "id", range(1, len(fights) + 1))
+    fight_rows = fights[["id", "fight_id", "event_id", "fighter0_id", "fighter1_id", "winner_id", "gender",
+                         "weight", "title", "was_draw", "method", "rounds", "fight_time_s"]]
+
+    with conn:
+        conn.executemany(f"INSERT INTO fighters VALUES ({', '.join('?' * 15)})", records(fighters))
+        conn.executemany("INSERT INTO events VALUES (?, ?, ?, ?)", records(events))
+        conn.executemany(f"INSERT OR IGNORE INTO fights VALUES ({', '.join('?' * 13)})", records(fight_rows))
+        conn.execute("""INSERT OR IGNORE INTO edges
+                        SELECT fighter0_id, fighter1_id, id FROM fights
+                        UNION ALL SELECT fighter1_id, fighter0_id, id FROM fights""")
+
+        # Pre-generated game tables (scraper.connect), re-keyed to fighter IDs
+        if table_exists(conn, "f", "daily_schedule"):
+            conn.executemany("INSERT INTO daily_schedule VALUES (?, ?)", [
+                (day, fighter_ids[(first, last)]) for day, first, last in
+                conn.execute("SELECT date, first_name, last_name FROM f.daily_schedule").fetchall()
+                if (first, last) in fighter_ids])
+        if table_exists(conn, "f", "connect_pairs"):
+            conn.executemany("INSERT INTO connect_pairs VALUES (?, ?, ?, ?, ?)", [
+                (pair_id, fighter_ids[(sf, sl)], fighter_ids[(ef, el)], distance, difficulty)
+                for pair_id, sf, sl, ef, el, distance, difficulty in conn.execute(
+                    """SELECT id, start_first_name, start_last_name, end_first_name, end_last_name,
+                              distance, difficulty FROM f.connect_pairs""").fetchall()
+                if (sf, sl) in fighter_ids and (ef, el) in fighter_ids])
+
+    conn.executescript(INDEXES)
+    conn.execute("DETACH DATABASE u")
+    conn.execute("DETACH DATABASE f")
+    conn.execute("ANALYZE")
+    conn.execute("VACUUM")
+    counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+              for table in ("fighters", "events", "fights", "edges", "daily_schedule", "connect_pairs")}
+    conn.close()
+    os.replace(tmp, out)
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge the scrape databases into one typed release database")
+    parser.add_argument("--ufc-db", default=UFC_DB)
+    parser.add_argument("--fighters-db", default=FIGHTERS_DB)
+    parser.add_argument("--out", default=RELEASE_DB)
+    args = parser.parse_args()
+    counts = build_release(args.ufc_db, args.fighters_db, args.out)
+    print(", ".join(f"{count} {table}" for table, count in counts.items()))
+    print(f"Wrote {args.out} ({os.path.getsize(args.out) // 1024} KB)")
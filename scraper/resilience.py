@@ -0,0 +1,234 @@
+# Retries for both engines: exponential backoff with full jitter, a retry budget and a
+# circuit breaker per host, and a log line per retry saying why it happened. Replaces
+# the drafts' fixed sleeps (45 s waits, sleep(5) + refresh, sleep(2) x 5), which cost
+# the same on a healthy site as on a broken one.
+#
+# A host's budget only allows retries while most of its requests succeed, so a site
+# that is down gets a few attempts rather than every request retrying in a loop. After
+# `threshold` failures in a row its breaker opens and requests to that host wait out a
+# cooldown while the other hosts carry on. Then one probe request goes through; if it
+# fails the breaker re-opens with the cooldown doubled (up to a cap).
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+
+import requests
+
+from scraper.metrics import Metrics
+from scraper.ratelimit import host_key
+
+# Statuses worth another try; anything else (404, 403...) fails straight away
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class Backoff:
+    def __init__(self, base: float = 0.5, cap: float = 30.0):
+        self.base = base
+        self.cap = cap
+
+    # Full jitter: uniform over [0, min(cap, base * 2^attempt)]
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+# gRPC-style retry throttling: each failure costs a token, each success refunds a
+# fraction of one, and retries are allowed only above half the maximum
+class RetryBudget:
+    def __init__(self, max_tokens: float = 10.0, refund: float = 0.1):
+        self.max_tokens = max_tokens
+        self.refund = refund
+        self.tokens = max_tokens
+        self.lock = threading.Lock()
+
+    def success(self):
+        with self.lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.refund)
+
+    def failure(self) -> bool:
+        with self.lock:
+            self.tokens = max(0.0, self.tokens - 1)
+            return self.tokens > self.max_tokens / 2
+
+class CircuitBreaker:
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0, max_cooldown: float = 600.0):
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        # Thread sending the half-open probe. A probe that never reports back (its
+        # caller raised something else) is given up on after a base cooldown.
+        self.probe = None
+        self.probe_started = 0.0
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+
+    def remaining(self) -> float:
+        with self.lock:
+            if self.opened_at is None:
+                return 0.0
+            return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    # Blocks while the circuit is open. Once the cooldown is over one caller goes
+    # through as the probe (half-open) and the rest wait for its outcome.
+    def wait(self):
+        me = threading.get_ident()
+        with self.changed:
+            while self.opened_at is not None:
+                now = time.monotonic()
+                remaining = self.opened_at + self.cooldown - now
+                if remaining > 0:
+                    self.changed.wait(remaining)
+                elif self.probe in (None, me) or now - self.probe_started > self.base_cooldown:
+                    self.probe, self.probe_started = me, now
+                    return
+                else:
+                    self.changed.wait(self.probe_started + self.base_cooldown - now)
+
+    def success(self):
+        with self.changed:
+            self.failures = 0
+            self.opened_at = None
+            self.probe = None
+            self.cooldown = self.base_cooldown
+            self.changed.notify_all()
+
+    # True if this failure opened the circuit
+    def failure(self) -> bool:
+        with self.changed:
+            if self.opened_at is None:
+                self.failures += 1
+                if self.failures < self.threshold:
+                    return False
+            elif self.probe != threading.get_ident():
+                return False  # sent before the circuit opened; it's open already
+            else:
+                self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            self.opened_at = time.monotonic()
+            self.probe = None
+            self.changed.notify_all()
+            return True
+
+    # The probe ended without a verdict on the host (a non-retryable error)
+    def release(self):
+        with self.changed:
+            if self.probe == threading.get_ident():
+                self.probe = None
+                self.changed.notify_all()
+
+# One JSON line per retry: when, which host and URL, attempt, reason, delay
+class RetryLog:
+    def __init__(self, path: str = None):
+        self.path = path
+        self.counts = Counter()
+        self.lock = threading.Lock()
+        self.file = open(path, "a") if path else None
+
+    def record(self, host: str, url: str, attempt: int, reason: str, delay: float, **extra):
+        with self.lock:
+            self.counts[(host, reason)] += 1
+            if self.file:
+                self.file.write(json.dumps({"at": time.time(), "host": host, "url": url, "attempt": attempt,
+                                            "reason": reason, "delay": round(delay, 3), **extra}) + "\n")
+                self.file.flush()
+
+    def summary(self) -> list[str]:
+        with self.lock:
+            return [f"{host}: {count} retries ({reason})" for (host, reason), count in self.counts.most_common()]
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+# Short label for why an attempt failed, or None if it shouldn't be retried
+def retry_reason(e: Exception) -> str | None:
+    if isinstance(e, requests.HTTPError) and e.response is not None:
+        status = e.response.status_code
+        return f"http {status}" if status in RETRY_STATUSES else None
+    if isinstance(e, requests.Timeout):
+        return "timeout"
+    if isinstance(e, requests.ConnectionError):
+        return "connection error"
+    return None
+
+class Resilience:
+    def __init__(self, attempts: int = 5, backoff: Backoff = None, log: RetryLog = None,
+                 breaker_threshold: int = 5, breaker_cooldown: float = 30.0, metrics: Metrics = None):
+        self.attempts = attempts
+        self.metrics = metrics or Metrics()
+        self.backoff = backoff or Backoff()
+        self.log = log or RetryLog()
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.budgets = {}
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    def host(self, url: str) -> tuple[str, RetryBudget, CircuitBreaker]:
+        key = host_key(url)
+        with self.lock:
+            if key not in self.budgets:
+                # Sized so the breaker opens (and pauses the host) well before the
+                # budget stops retrying: it refuses after 2 x threshold failures
+                self.budgets[key] = RetryBudget(max_tokens=4.0 * self.breaker_threshold)
+                self.breakers[key] = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown)
+            return key, self.budgets[key], self.breakers[key]
+
+    # Outcome of one attempt against the host. Returns the delay before the next
+    # attempt, or raises `error` when retrying isn't allowed.
+    def failed(self, url: str, attempt: int, reason: str, error: Exception, retry_after: float = None,
+               attempts: int = None, **extra) -> float:
+        host, budget, breaker = self.host(url)
+        opened = breaker.failure()
+        if not budget.failure() or attempt >= (attempts or self.attempts) - 1:
+            raise error
+        delay = max(self.backoff.delay(attempt), retry_after or 0)
+        if opened:
+            extra["circuit_opened_for"] = breaker.cooldown
+            self.metrics.inc("circuit_opened", host=host)
+        self.record(host, url, attempt + 1, reason, delay, **extra)
+        return delay
+
+    def record(self, host: str, url: str, attempt: int, reason: str, delay: float, **extra):
+        self.log.record(host, url, attempt, reason, delay, **extra)
+        self.metrics.inc("retries", host=host, reason=reason)
+
+    def succeeded(self, url: str):
+        _, budget, breaker = self.host(url)
+        budget.success()
+        breaker.success()
+
+    def call(self, url: str, fn):
+        for attempt in range(self.attempts):
+            self.host(url)[2].wait()
+            started = time.monotonic()
+            try:
+                result = fn()
+            except Exception as e:
+                reason = retry_reason(e)
+                if reason is None:
+                    self.host(url)[2].release()
+                    raise
+                response = getattr(e, "response", None)
+                retry_after = response.headers.get("Retry-After") if response is not None else None
+                delay = self.failed(url, attempt, reason, e,
+                                    float(retry_after) if retry_after and retry_after.isdigit() else None,
+                                    waited=round(time.monotonic() - started, 3))
+                time.sleep(delay)
+                continue
+            self.succeeded(url)
+            return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a retry log")
+    parser.add_argument("log", nargs="?", default="retries.jsonl")
+    args = parser.parse_args()
+    with open(args.log, "r") as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    by_reason = Counter((entry["host"], entry["reason"]) for entry in entries)
+    for (host, reason), count in by_reason.most_common():
+        waits = sorted(entry.get("waited", 0) for entry in entries
+                       if entry["host"] == host and entry["reason"] == reason)
+        print(f"{host:15} {reason:45} {count:6}  median {waits[len(waits) // 2]:.1f}s before failing")
@@ -0,0 +1,197 @@
+# Fighter autocomplete index. The server's searchFighters runs LIKE '%term%' over
+# first_name, last_name and nickname on every keystroke, which is a full scan. This
+# builds into fighters.db:
+#
+#   fighter_search  one row per fighter with accent-folded lower-case name columns,
+#                   a single_name flag, an eligible (allowed weight class) flag and
+#                   name_rank, the fighter's place in the server's first_name,
+#                   last_name tie-break order
+#   fighter_fts     FTS5 trigram index over those columns, so substring matches on
+#                   3+ characters are index lookups
+#
+# search() returns what searchFighters does. Terms of 1-2 characters are still
+# substring matches; trigrams can't index them, so those queries scan the narrow
+# fighter_search table of eligible fighters instead of fighters.
+#
+#   python -m scraper.search build
+#   python -m scraper.search bench      latency against the current LIKE query
+import argparse
+import random
+import sqlite3
+import statistics
+import time
+
+from scraper.ingest import FIGHTERS_DB
+from scraper.names import normalize
+from scraper.records import ALLOWED_WEIGHTS
+
+SCHEMA = f"""
+DROP TABLE IF EXISTS fighter_fts;
+DROP TABLE IF EXISTS fighter_search;
+CREATE TABLE fighter_search (
+    id INTEGER PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    first_norm TEXT NOT NULL,
+    last_norm TEXT NOT NULL,
+    nick_norm TEXT NOT NULL,
+    single_name INTEGER NOT NULL,
+    eligible INTEGER NOT NULL,
+    name_rank INTEGER NOT NULL
+);
+CREATE INDEX idx_fighter_search_rank ON fighter_search(eligible, name_rank);
+CREATE INDEX idx_fighter_search_first ON fighter_search(first_norm);
+CREATE INDEX idx_fighter_search_last ON fighter_search(last_norm);
+CREATE INDEX idx_fighter_search_nick ON fighter_search(nick_norm);
+CREATE VIRTUAL TABLE fighter_fts USING fts5(
+    first_norm, last_norm, nick_norm,
+    content='fighter_search', content_rowid='id', tokenize='trigram'
+);
+"""
+
+# Same tie-breaks as searchFighters: single-name prefix, first, last, nickname, then
+# first_name, last_name (precomputed as name_rank)
+ORDER_BY = """
+ORDER BY CASE
+    WHEN s.single_name AND s.first_norm GLOB :first || '*' THEN 1
+    WHEN instr(s.first_norm, :first) THEN 2
+    WHEN instr(s.last_norm, :last) THEN 3
+    WHEN instr(s.nick_norm, :query) THEN 4
+    ELSE 5
+END, s.name_rank
+LIMIT :limit
+"""
+
+# The server's current query, kept verbatim as the benchmark baseline
+LIKE_QUERY = f"""
+SELECT DISTINCT first_name, last_name FROM fighters
+WHERE {{where}}
+AND weight IN ({", ".join(f"'{w}'" for w in ALLOWED_WEIGHTS)})
+ORDER BY
+  CASE
+    WHEN first_name LIKE ? AND (last_name IS NULL OR last_name = '') THEN 1
+    WHEN first_name LIKE ? THEN 2
+    WHEN last_name LIKE ? THEN 3
+    WHEN nickname LIKE ? THEN 4
+    ELSE 5
+  END,
+  first_name, last_name
+LIMIT 10
+"""
+
+def build_search_index(fighters_db: str = FIGHTERS_DB) -> int:
+    conn = sqlite3.connect(fighters_db)
+    # One row per name: NULL and '' last names would otherwise duplicate single-name fighters
+    rows = conn.execute("""SELECT MIN(rowid), first_name, last_name, nickname, weight FROM fighters
+                           GROUP BY first_name, COALESCE(last_name, '')""").fetchall()
+    # Python compares code points, which orders like SQLite's BINARY collation on UTF-8
+    ranks = {(first_name, last_name or ""): rank for rank, (first_name, last_name) in
+             enumerate(sorted((first_name, last_name or "") for _, first_name, last_name, _, _ in rows))}
+    with conn:
+        conn.executescript("BEGIN;" + SCHEMA)
+        conn.executemany(
+            """INSERT INTO fighter_search (id, first_name, last_name, first_norm, last_norm,
+                                           nick_norm, single_name, eligible, name_rank)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            [(rowid, first_name, last_name or "", normalize(first_name), normalize(last_name),
+              normalize(nickname), int(not last_name), int(weight in ALLOWED_WEIGHTS),
+              ranks[(first_name, last_name or "")])
+             for rowid, first_name, last_name, nickname, weight in rows])
+        conn.execute("INSERT INTO fighter_fts (fighter_fts) VALUES ('rebuild')")
+    conn.close()
+    return len(rows)
+
+def phrase(column: str, term: str) -> str:
+    return f'{column} : "{term}"'
+
+def search(conn: sqlite3.Connection, query: str, limit: int = 10) -> list[tuple[str, str]]:
+    # Split on spaces first, like the server, so "O'Neil" stays one term ("o neil")
+    terms = [term for term in (normalize(word) for word in query.split(" ")) if term]
+    if not terms:
+        return []
+    params = {"first": terms[0], "last": terms[-1], "query": " ".join(terms), "limit": limit}
+
+    # The single-name prefix branch is implied by the first-name substring for one term
+    if len(terms) == 1:
+        where = "(instr(s.first_norm, :first) OR instr(s.last_norm, :first) OR instr(s.nick_norm, :first))"
+        match = f'"{terms[0]}"' if len(terms[0]) >= 3 else None
+    else:
+        where = """((s.single_name AND s.first_norm GLOB :first || '*')
+                    OR (instr(s.first_norm, :first) AND instr(s.last_norm, :last))
+                    OR instr(s.nick_norm, :query))"""
+        name_match = " AND ".join(phrase(column, term) for column, term
+                                  in (("first_norm", terms[0]), ("last_norm", terms[-1])) if len(term) >= 3)
+        match = f"({name_match}) OR {phrase('nick_norm', params['query'])}" if name_match else None
+
+    if match is None:
+        sql = f"SELECT s.first_name, s.last_name FROM fighter_search s WHERE s.eligible AND {where} {ORDER_BY}"
+    else:
+        # Trigram candidates plus single-name prefixes (a b-tree range on first_norm),
+        # re-checked with the exact substring rules
+        params["match"] = match
+        sql = f"""WITH candidates(id) AS (
+                      SELECT rowid FROM fighter_fts WHERE fighter_fts MATCH :match
+                      UNION SELECT id FROM fighter_search WHERE first_norm GLOB :first || '*' AND single_name)
+                  SELECT s.first_name, s.last_name FROM candidates
+                  JOIN fighter_search s ON s.id = candidates.id
+                  WHERE s.eligible AND {where} {ORDER_BY}"""
+    return conn.execute(sql, params).fetchall()
+
+def like_search(conn: sqlite3.Connection, query: str) -> list[tuple[str, str]]:
+    terms = [term for term in query.split(" ") if term]
+    if len(terms) == 1:
+        where = """((first_name LIKE ? AND (last_name IS NULL OR last_name = '')) OR
+                    (first_name LIKE ? OR last_name LIKE ? OR nickname LIKE ?))"""
+        params = [f"{terms[0]}%", f"%{terms[0]}%", f"%{terms[0]}%", f"%{terms[0]}%"]
+    else:
+        where = """((first_name LIKE ? AND (last_name IS NULL OR last_name = '')) OR
+                    (first_name LIKE ? AND last_name LIKE ?) OR (nickname LIKE ?))"""
+        params = [f"{terms[0]}%", f"%{terms[0]}%", f"%{terms[-1]}%", f"%{query}%"]
+    return conn.execute(LIKE_QUERY.format(where=where), params + params).fetchall()
+
+# What people type: 1-6 character prefixes of real first and last names, plus
+# "first l" style two-word queries
+def sample_queries(conn: sqlite3.Connection, count: int, seed: int) -> list[str]:
+    names = conn.execute("SELECT first_name, COALESCE(last_name, '') FROM fighters").fetchall()
+    rng = random.Random(seed)
+    queries = []
+    for first_name, last_name in rng.sample(names, min(count, len(names))):
+        word = rng.choice([w for w in (first_name, last_name) if w])
+        queries.append(word[:rng.randint(1, 6)])
+        if last_name:
+            queries.append(f"{first_name} {last_name[:rng.randint(1, 4)]}")
+    return queries
+
+def bench(fighters_db: str = FIGHTERS_DB, count: int = 200, seed: int = 0):
+    conn = sqlite3.connect(fighters_db)
+    queries = sample_queries(conn, count, seed)
+
+    def timed(fn) -> list[float]:
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            fn(conn, query)
+            latencies.append((time.perf_counter() - start) * 1000)
+        return sorted(latencies)
+
+    like, fts = timed(like_search), timed(search)
+    # Same fighters in the same order; accent folding is the one intended difference
+    agree = sum([(first, last or "") for first, last in like_search(conn, q)] == search(conn, q)
+                for q in queries)
+    for label, latencies in (("LIKE", like), ("FTS5", fts)):
+        print(f"{label}: median {statistics.median(latencies):.3f} ms, "
+              f"p95 {latencies[int(len(latencies) * 0.95)]:.3f} ms over {len(queries)} queries")
+    print(f"Speedup {statistics.median(like) / statistics.median(fts):.1f}x (median); "
+          f"same results for {agree}/{len(queries)} queries")
+    conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or benchmark the fighter search index")
+    parser.add_argument("command", choices=["build", "bench"])
+    parser.add_argument("--fighters-db", default=FIGHTERS_DB)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    if args.command == "build":
+        print(f"Indexed {build_search_index(args.fighters_db)} fighters")
+    else:
+        bench(args.fighters_db, args.queries)
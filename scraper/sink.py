@@ -0,0 +1,90 @@
+# Streaming CSV sink. Each event's fights and newly met fighters are appended and
+# fsynced as soon as the event is finished, and every event is logged in a
+# checkpoint file, so a crash loses at most the event in progress.
+#
+# The checkpoint is an append-only JSON-lines log. Before an event is written we log
+# "begin" with the current size of each CSV and its fingerprint index; after the write
+# we log "done". If a run dies in between, the next run truncates them back to those
+# sizes. Rows already in a CSV are dropped by fingerprint, and changed ones are
+# appended and replace the row they supersede on close (see scraper.merge).
+import json
+import os
+
+from scraper.merge import CsvTable, fight_keys, fighter_keys
+
+class CheckpointLog:
+    def __init__(self, path: str):
+        self.path = path
+        self.done = set()
+        self.pending = None
+        if os.path.isfile(path):
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line from a crash
+                    if entry["state"] == "begin":
+                        self.pending = entry
+                    else:
+                        self.pending = None
+                        if entry["state"] == "done":
+                            self.done.add(entry["event"])
+        self.file = open(path, "a")
+
+    def log(self, state: str, event: str, **extra):
+        self.file.write(json.dumps({"state": state, "event": event, **extra}) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+class CsvSink:
+    def __init__(self, fights_path: str = "ufc.csv", fighters_path: str = "fighters.csv",
+                 checkpoint_path: str = "scrape_checkpoint.jsonl"):
+        self.checkpoint = CheckpointLog(checkpoint_path)
+
+        # Roll back a half-written event from a crashed run
+        pending = self.checkpoint.pending
+        if pending is not None:
+            # Older checkpoints keyed the offsets by "fights" / "fighters"
+            legacy = {"fights": fights_path, "fighters": fighters_path}
+            for path, size in pending["offsets"].items():
+                path = legacy.get(path, path)
+                if os.path.isfile(path):
+                    with open(path, "r+b") as f:
+                        f.truncate(size)
+            self.checkpoint.log("aborted", pending["event"])
+
+        self.tables = {"fights": CsvTable(fights_path, fight_keys),
+                       "fighters": CsvTable(fighters_path, fighter_keys)}
+
+    def is_done(self, event_url: str) -> bool:
+        return event_url in self.checkpoint.done
+
+    def write_event(self, event_url: str, fights: list[dict], fighters: list[dict] = ()):
+        selected = {"fights": self.tables["fights"].select(fights),
+                    "fighters": self.tables["fighters"].select(list(fighters))}
+        # A header rewrite can't be truncated back, so it happens (atomically) before
+        # "begin"; only rows are appended after it
+        for name, table in self.tables.items():
+            table.widen([row for row, _, _ in selected[name]])
+
+        offsets = {path: size for table in self.tables.values() for path, size in table.sizes().items()}
+        self.checkpoint.log("begin", event_url, offsets=offsets)
+        for name, table in self.tables.items():
+            table.append(selected[name])
+        self.checkpoint.log("done", event_url)
+        self.checkpoint.done.add(event_url)
+
+    def close(self):
+        for table in self.tables.values():
+            table.close()
+        self.checkpoint.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,123 @@
+# Opt-in WebDriver command tracing. Every element lookup, .text, get_attribute() and
+# page load is a chromedriver round trip; wrapping driver.execute (which WebElements
+# call through their parent driver too) records each command with its duration, the
+# page it ran on and the code that issued it.
+#
+#   <path>.txt      per-page report: commands, IPC time, errors, top call sites
+#   <path>.folded   folded stacks weighted by microseconds, for flamegraph.pl or speedscope
+#
+# Enable it with --trace on the espn engine, or WEBDRIVER_TRACE=<path> for the drafts.
+# Stats are aggregated as commands come in, so a full backfill doesn't hold every
+# command in memory.
+import atexit
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+# Frames from these aren't call sites worth reporting
+SKIPPED_FRAMES = (os.sep + "selenium" + os.sep, __file__)
+
+def call_stack(frame) -> list[str]:
+    stack = []
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not any(skipped in filename for skipped in SKIPPED_FRAMES):
+            stack.append(f"{frame.f_code.co_name} ({os.path.basename(filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return stack[::-1]
+
+class PageStats:
+    def __init__(self):
+        self.commands = 0
+        self.seconds = 0.0
+        self.errors = Counter()
+        # (call site, command) -> [count, seconds]
+        self.sites = defaultdict(lambda: [0, 0.0])
+
+    def add(self, site: str, command: str, seconds: float, error: str = None):
+        self.commands += 1
+        self.seconds += seconds
+        if error:
+            self.errors[error] += 1
+        self.sites[(site, command)][0] += 1
+        self.sites[(site, command)][1] += seconds
+
+    def top(self, n: int) -> list[tuple[tuple[str, str], list]]:
+        return sorted(self.sites.items(), key=lambda item: item[1][1], reverse=True)[:n]
+
+class CommandTracer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pages = defaultdict(PageStats)
+        self.total = PageStats()
+        self.folded = Counter()
+        self.current = {}  # id(driver) -> URL of the last get()
+
+    def wrap(self, driver):
+        execute = driver.execute
+
+        def traced(command, params=None):
+            if command == "get" and params:
+                with self.lock:
+                    self.current[id(driver)] = params.get("url")
+            stack = call_stack(sys._getframe(1))
+            started = time.perf_counter()
+            error = None
+            try:
+                return execute(command, params)
+            except Exception as e:
+                error = type(e).__name__
+                raise
+            finally:
+                self.record(driver, command, stack, time.perf_counter() - started, error)
+
+        driver.execute = traced
+        return driver
+
+    def record(self, driver, command: str, stack: list[str], seconds: float, error: str = None):
+        site = stack[-1] if stack else "?"
+        with self.lock:
+            page = self.current.get(id(driver)) or "(no page)"
+            self.pages[page].add(site, command, seconds, error)
+            self.total.add(site, command, seconds, error)
+            self.folded[";".join([*stack, command + (f" [{error}]" if error else "")])] += seconds
+
+    def report(self, top: int = 5) -> str:
+        lines = []
+
+        def section(title: str, stats: PageStats, n: int):
+            errors = ", ".join(f"{count} {name}" for name, count in stats.errors.most_common())
+            lines.append(f"{title}: {stats.commands} commands, {stats.seconds:.2f} s IPC"
+                         + (f", errors: {errors}" if errors else ""))
+            for (site, command), (count, seconds) in stats.top(n):
+                lines.append(f"  {count:6} {seconds:8.3f} s  {command:24} {site}")
+            lines.append("")
+
+        with self.lock:
+            section("All pages", self.total, top * 4)
+            for url, stats in sorted(self.pages.items(), key=lambda item: item[1].seconds, reverse=True):
+                section(url, stats, top)
+        return "\n".join(lines)
+
+    # "frame;frame;command <microseconds>" per distinct stack
+    def to_folded(self) -> str:
+        with self.lock:
+            return "".join(f"{stack} {round(seconds * 1e6)}\n" for stack, seconds in sorted(self.folded.items()))
+
+    def write(self, path: str = "webdriver_trace"):
+        for suffix, body in ((".txt", self.report()), (".folded", self.to_folded())):
+            with open(path + suffix + ".tmp", "w") as f:
+                f.write(body)
+            os.replace(path + suffix + ".tmp", path + suffix)
+
+# For scripts that build their own driver (the drafts): traces it when
+# WEBDRIVER_TRACE is set and writes the report when the script exits
+def trace_from_env(driver, var: str = "WEBDRIVER_TRACE"):
+    path = os.environ.get(var)
+    if not path:
+        return driver
+    tracer = CommandTracer()
+    atexit.register(tracer.write, path)
+    return tracer.wrap(driver)
@@ -0,0 +1,301 @@
+# Browser-free ufcstats.com scraper. The pages are static HTML, so a pooled HTTP
+# session plus lxml produces the same ufc.csv rows as ufc_scrape_draft_1.py, and the
+# same fighters.csv bios as ufc_scrape_draft_0.py.
+import argparse
+import os
+from itertools import chain
+from urllib.parse import quote_plus
+
+import requests
+
+from scraper.cache import CacheMiss, PageCache
+from scraper.changes import ChangeTracker
+from scraper.fetch import Fetcher, imap_ordered
+from scraper.identity import IdentityResolver
+from scraper.metrics import Metrics, Progress
+from scraper.ingest import Ingest
+from scraper.parsers import bing, espn
+from scraper.parsers.ufcstats import parse_event, parse_event_links, parse_fight
+from scraper.profiles import FighterRegistry, ProfileStore
+from scraper.records import Fight
+from scraper.resilience import Resilience, RetryLog
+from scraper.sink import CsvSink
+
+main_url = "http://ufcstats.com/statistics/events/completed?page=all"
+
+# Last scraped event (only scrape new events)
+def check_last_event() -> str | None:
+    if (os.path.isfile("last_scraped_event.txt")):
+        with open("last_scraped_event.txt", "r") as f:
+            return f.read()
+    else:
+        return None
+
+def split_name(name: str) -> tuple[str, str]:
+    return tuple(name.split(" ", 1)) if " " in name else (name, "")
+
+# Row in the same shape the Selenium drafts append to fights_data
+def fight_record(fight: Fight, date: str, location: str) -> dict:
+    fighter0_first_name, fighter0_last_name = split_name(fight.fighters[0])
+    fighter1_first_name, fighter1_last_name = split_name(fight.fighters[1])
+    return {
+        "fighter_0_first_name": fighter0_first_name,
+        "fighter_0_last_name": fighter0_last_name,
+        "fighter_1_first_name": fighter1_first_name,
+        "fighter_1_last_name": fighter1_last_name,
+        'winner': fight.winner,
+        "event": fight.event,
+        "date": date,
+        "location": location,
+        "title": fight.title,
+        "method": fight.method,
+        "rounds": fight.rounds,
+        "fight_time": fight.fight_time,
+        "gender": fight.gender,
+        "weight": fight.weight_class,
+    }
+
+def bing_url(first_name: str, last_name: str, nickname: str) -> str:
+    terms = quote_plus(f"{first_name} {last_name} {nickname}".strip())
+    return f"https://www.bing.com/search?q=%2Bsite%3Aespn.com+{terms}+mma+fighter+profile"
+
+# draft_0's fighter lookup over HTTP: ESPN profile -> bio tab. The profile comes from
+# the local identity resolver when it is confident, otherwise from the first Bing hit.
+def lookup_fighter(fetcher: Fetcher, name: str, nickname: str, gender: str,
+                   resolver: IdentityResolver = None) -> tuple[dict, str]:
+    first_name, last_name = split_name(name)
+    fighter_link = resolver.resolve(first_name, last_name, nickname)[0] if resolver else None
+    if fighter_link is None:
+        with fetcher.metrics.stage("bing"):
+            fighter_link = bing.parse_first_result(fetcher.get(bing_url(first_name, last_name, nickname)))
+    else:
+        fetcher.metrics.inc("identity_resolved")
+    with fetcher.metrics.stage("profile"):
+        bio_link = espn.parse_profile(fetcher.get(fighter_link), fighter_link)
+        fighter = espn.parse_fighter(fetcher.get(bio_link), bio_link)
+
+    row = fighter.as_row(gender, nickname=nickname)
+    row.update(first_name=first_name, last_name=last_name)
+    return row, fighter_link
+
+# Revalidated, since a profile fetched within its 7-day TTL may predate the fight
+def refresh_record(fetcher: Fetcher, profile_url: str, stored: dict) -> dict:
+    wins, losses, draws = espn.parse_record(fetcher.get(profile_url, revalidate=True), profile_url)
+    return {**stored, "wins": wins, "losses": losses, "draws": draws}
+
+# Both fighters of every fight on the card, keyed by their ufcstats fighter page
+def resolve_fighters(fetcher: Fetcher, registry: FighterRegistry, fights: list[Fight], date: str,
+                     resolver: IdentityResolver = None):
+    def resolve(job):
+        fighter_id, name, nickname, gender = job
+        return registry.get_or_scrape(
+            fighter_id,
+            lambda: lookup_fighter(fetcher, name, nickname, gender, resolver),
+            lambda profile_url, stored: refresh_record(fetcher, profile_url, stored),
+            date)
+
+    jobs = [(link, name, nickname, fight.gender) for fight in fights
+            for link, name, nickname in zip(fight.fighter_links, fight.fighters, fight.nicknames)]
+    with fetcher.metrics.stage("fighters"):
+        list(fetcher.executor.map(resolve, jobs))
+
+def get_event_links(fetcher: Fetcher, last_scraped_event: str = None) -> list[str]:
+    return parse_event_links(fetcher.get(main_url), main_url, last_scraped_event)
+
+# A failed fetch (or an offline cache miss) comes back as the error, so it flags that
+# event instead of ending the run
+def fetch_or_error(fetcher: Fetcher, url: str, revalidate: bool = False) -> tuple[str | None, Exception | None]:
+    try:
+        return fetcher.get(url, revalidate), None
+    except (requests.RequestException, CacheMiss) as e:
+        return None, e
+
+# Yields (event_url, fights) one event at a time, in card order. The next event
+# page is prefetched while the current event's fight pages are fetched in parallel.
+# Fighter bios are only looked up when a registry is given; page digests are staged
+# when a tracker is given, as the baseline for later rechecks.
+# An event that can't be fetched (or, offline, isn't cached) or parsed is counted in
+# events_failed, flagged for the next run's recheck when there is a tracker, and skipped.
+def scrape_events(fetcher: Fetcher, event_links: list[str], registry: FighterRegistry = None,
+                  resolver: IdentityResolver = None, tracker: ChangeTracker = None, progress: Progress = None):
+    event_pages = imap_ordered(fetcher.executor, lambda url: fetch_or_error(fetcher, url), event_links, 2)
+    for event_url, (event_page, error) in zip(event_links, event_pages):
+        try:
+            if error is not None:
+                raise error
+            with fetcher.metrics.stage("parse"):
+                event = parse_event(event_page)
+            fight_pages = list(fetcher.map(event.fight_links))
+            with fetcher.metrics.stage("parse"):
+                fights = [parse_fight(fight_page) for fight_page in fight_pages]
+            if registry is not None:
+                resolve_fighters(fetcher, registry, fights, event.date, resolver)
+        except (requests.RequestException, CacheMiss, IndexError, ValueError) as e:
+            print(f"{event_url}: {e!r}, left for the next run")
+            fetcher.metrics.inc("events_failed")
+            if tracker is not None:
+                tracker.flag(event_url, repr(e))
+            if progress is not None:
+                progress.tick()
+            continue
+        if tracker is not None:
+            for url, page in zip([event_url, *event.fight_links], [event_page, *fight_pages]):
+                tracker.changed(url, page)
+        yield event_url, [fight_record(fight, event.date, event.location) for fight in fights]
+
+# Revalidates events that were already scraped and yields (event_url, fights) only for
+# those whose event or fight pages changed, or that were flagged. The event page lists
+# every bout's result and method, so an amended card or an overturn changes it and the
+# fight pages are only revalidated then. Only the fighters of changed fights are refreshed.
+def recheck_events(fetcher: Fetcher, tracker: ChangeTracker, event_links: list[str],
+                   registry: FighterRegistry = None, resolver: IdentityResolver = None, progress: Progress = None):
+    flagged = set(tracker.flagged())
+    event_pages = imap_ordered(fetcher.executor, lambda url: fetch_or_error(fetcher, url, revalidate=True),
+                               event_links, 2)
+    for event_url, (event_page, error) in zip(event_links, event_pages):
+        if error is None and not tracker.changed(event_url, event_page) and event_url not in flagged:
+            fetcher.metrics.inc("events_unchanged")
+            if progress is not None:
+                progress.tick()
+            continue
+        event = None
+        try:
+            if error is not None:
+                raise error
+            event = parse_event(event_page)
+            fight_pages = list(fetcher.map(event.fight_links, revalidate=True))
+            changed = [tracker.changed(url, page) for url, page in zip(event.fight_links, fight_pages)]
+            with fetcher.metrics.stage("parse"):
+                fights = [parse_fight(fight_page) for fight_page in fight_pages]
+        except (requests.RequestException, IndexError, ValueError) as e:
+            tracker.discard([event_url, *(event.fight_links if event else [])])
+            tracker.flag(event_url, repr(e))
+            fetcher.metrics.inc("events_flagged")
+            if progress is not None:
+                progress.tick()
+            continue
+        fetcher.metrics.inc("fights_changed", sum(changed))
+        if registry is not None:
+            # No event date: these fighters are refreshed once this run, however recent
+            # their stored profile is
+            resolve_fighters(fetcher, registry, [fight for fight, c in zip(fights, changed) if c], None, resolver)
+        yield event_url, [fight_record(fight, event.date, event.location) for fight in fights]
+
+def main(max_in_flight: int = 8, cache_dir: str = ".page_cache", offline: bool = False,
+         profiles_db: str = "profiles.db", ingest: bool = False, parquet_dir: str = None,
+         digests_db: str = "page_digests.db", recheck: int = 5, retry_log: str = "retries.jsonl",
+         backfill: bool = False, metrics_path: str = "metrics"):
+    cache = PageCache(cache_dir) if cache_dir else None
+    db = Ingest() if ingest else None
+    store = ProfileStore(profiles_db) if profiles_db else None
+    registry = FighterRegistry(store) if store else None
+    resolver = IdentityResolver.from_store(store) if store else None
+    parquet = None
+    if parquet_dir:
+        from scraper.columnar import ParquetSink  # pyarrow is only loaded for Parquet output
+        parquet = ParquetSink(parquet_dir)
+    tracker = ChangeTracker(digests_db) if digests_db and not offline else None
+    metrics = Metrics()
+    resilience = Resilience(log=RetryLog(retry_log), metrics=metrics)
+    # Offline replay writes into the existing CSVs: re-parsed rows replace theirs by
+    # key, and events that aren't cached keep the rows they have
+    with Fetcher(max_in_flight=max_in_flight, cache=cache, offline=offline,
+                 resilience=resilience, metrics=metrics) as fetcher, CsvSink() as sink:
+        event_links = get_event_links(fetcher)
+
+        if offline:
+            # Offline replay re-parses everything in the cache, not just new events
+            todo, rechecks = event_links, []
+        elif backfill:
+            # Full history; only events committed by an earlier run are skipped
+            todo, rechecks = [url for url in event_links if not sink.is_done(url)], []
+        else:
+            # New events: not committed by an earlier (possibly crashed) run, not seen by
+            # the tracker, and newer than last_scraped_event.txt
+            last_scraped_event = check_last_event()
+            older = set(event_links[event_links.index(last_scraped_event):]) \
+                if last_scraped_event in event_links else set()
+            todo = [url for url in event_links if not sink.is_done(url) and url not in older
+                    and not (tracker and tracker.known(url))]
+            rechecks = []
+            if tracker is not None:
+                for url in event_links[:recheck] + tracker.flagged():
+                    if url not in todo and url not in rechecks:
+                        rechecks.append(url)
+
+        progress = Progress(metrics, len(todo) + len(rechecks))
+        events = scrape_events(fetcher, todo, registry, resolver, tracker, progress)
+        if rechecks:
+            events = chain(events, recheck_events(fetcher, tracker, rechecks, registry, resolver, progress))
+        written = set()
+        for event_url, fights in events:
+            print(event_url)
+            fighters = registry.drain() if registry else []
+            # DB upserts are idempotent, so they go first: a crash before the CSV
+            # checkpoint just repeats them on resume
+            if db is not None:
+                with metrics.stage("ingest"):
+                    db.ingest_event(fights, fighters)
+            if parquet is not None:
+                with metrics.stage("parquet"):
+                    parquet.write_event(event_url, fights, fighters)
+            with metrics.stage("write"):
+                sink.write_event(event_url, fights, fighters)
+            written.add(event_url)
+            if tracker is not None:
+                tracker.commit()
+                tracker.unflag(event_url)
+            metrics.inc("records", len(fights), kind="fights")
+            metrics.inc("records", len(fighters), kind="fighters")
+            progress.tick()
+        failed = [url for url in todo if url not in written]
+
+    if offline:
+        # Nothing new was fetched, so last_scraped_event.txt stays as it is
+        if failed:
+            print(f"{len(failed)} of {len(todo)} events skipped (not cached or unparseable); "
+                  "their existing rows were kept")
+    elif event_links and (tracker is not None or not failed):
+        # Without a tracker to flag them, failed events are only retried if the
+        # marker stays where it was
+        with open("last_scraped_event.txt", "w") as f:
+            f.write(event_links[0])
+
+    if tracker is not None:
+        tracker.commit()  # checked_at for the events that hadn't changed
+        tracker.close()
+    if store is not None:
+        store.close()
+    if db is not None:
+        db.close()
+    for line in resilience.log.summary():
+        print(line)
+    resilience.log.close()
+    if metrics_path:
+        metrics.write(metrics_path)
+
+    print("CSV saved!")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape ufcstats.com into ufc.csv")
+    parser.add_argument("--workers", type=int, default=8, help="requests in flight")
+    parser.add_argument("--cache-dir", default=".page_cache")
+    parser.add_argument("--offline", action="store_true",
+                        help="re-run the parsers against cached pages only, no network")
+    parser.add_argument("--profiles-db", default="profiles.db",
+                        help="fighter profile store; pass '' to skip fighter bios")
+    parser.add_argument("--ingest", action="store_true",
+                        help="also upsert each event into shared/ufcSQL.db and shared/fighters.db")
+    parser.add_argument("--parquet", metavar="DIR",
+                        help="also write each event to a Parquet dataset partitioned by year")
+    parser.add_argument("--digests-db", default="page_digests.db",
+                        help="page digests for change detection; pass '' to disable")
+    parser.add_argument("--recheck", type=int, default=5,
+                        help="revalidate this many of the newest events already scraped")
+    parser.add_argument("--retry-log", default="retries.jsonl",
+                        help="one JSON line per retry with its reason (summarize with python -m scraper.resilience)")
+    parser.add_argument("--metrics", default="metrics",
+                        help="write run metrics to METRICS.json and METRICS.prom; pass '' to skip")
+    args = parser.parse_args()
+    main(args.workers, args.cache_dir, args.offline, args.profiles_db, args.ingest, args.parquet,
+         args.digests_db, args.recheck, args.retry_log, metrics_path=args.metrics)
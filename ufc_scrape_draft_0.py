@@ -8,6 +8,7 @@ from selenium.webdriver.support import expected_conditions as EC
 import os
 import pandas as pd
 import time
+from scraper.tracing import trace_from_env
 
 # Setup Selenium (https://www.selenium.dev/documentation/webdriver/browsers/chrome/)
 options = Options()
@@ -17,6 +18,8 @@ options.add_argument("--disable-dev-shm-usage")
 
 driver = webdriver.Chrome(service=Service(
     ChromeDriverManager().install()), options=options)
+# WEBDRIVER_TRACE=<path> records every WebDriver command (see scraper/tracing.py)
+driver = trace_from_env(driver)
 wait = WebDriverWait(driver, 45)
 
 main_url = "http://ufcstats.com/statistics/events/completed?page=all"
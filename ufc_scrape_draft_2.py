@@ -10,6 +10,7 @@ import pandas as pd
 import time
 from datetime import datetime
 from selenium.common.exceptions import NoSuchElementException
+from scraper.tracing import trace_from_env
 
 # Setup Selenium (https://www.selenium.dev/documentation/webdriver/browsers/chrome/)
 options = Options()
@@ -18,6 +19,8 @@ options.add_argument("--disable-dev-shm-usage")
 # options.add_argument("--headless")
 
 driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+# WEBDRIVER_TRACE=<path> records every WebDriver command (see scraper/tracing.py)
+driver = trace_from_env(driver)
 wait = WebDriverWait(driver, 45)
 
 main_url = "https://www.espn.com/mma/schedule/_/year/1993/league/ufc"